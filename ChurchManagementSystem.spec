@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('config/db_config.py', 'config')],
+    datas=[('config/db_config.py', 'config'), ('database/migrations', 'database/migrations')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
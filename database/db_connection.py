@@ -1,10 +1,14 @@
 import pymysql.cursors
 import pymysql.err
+from pymysql.constants import SERVER_STATUS
 import os
 import sys
 import importlib.util
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-import sqlite3  # <-- ADDED: Import SQLite module
 
 
 # Define a custom exception to signal connection/config failure to the GUI
@@ -32,7 +36,6 @@ def resource_path(relative_path):
 
 CONFIG_FILE_PATH = resource_path(os.path.join("config", "db_config.py"))
 DB_CONFIG = {}
-LOCAL_DB_PATH = 'local_cache.db'  # Define local cache file
 
 try:
     # Dynamically load the module from its absolute path
@@ -49,181 +52,360 @@ except Exception as e:
 
 
 # ----------------------------------------------------------------------
-# PRIMARY (MYSQL) CONNECTION FUNCTION
+# PRIMARY (MYSQL) CONNECTION POOL
 # ----------------------------------------------------------------------
-def get_connection():
-    """Create and return a database connection using PyMySQL."""
+# Pool tuning. Kept out of DB_CONFIG because that dict is passed straight
+# to pymysql.connect().
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # seconds
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))  # seconds per connect attempt
+
+# Circuit breaker tuning (see CircuitBreaker below)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", "2"))
+BREAKER_RETRY_INTERVAL = float(os.getenv("DB_BREAKER_RETRY_INTERVAL", "15"))  # seconds, first re-probe
+BREAKER_MAX_RETRY_INTERVAL = float(os.getenv("DB_BREAKER_MAX_RETRY_INTERVAL", "300"))  # seconds, backoff cap
+
+# Rows per page for the keyset-paginated grid queries (get_*_page functions)
+PAGE_SIZE = 200
+
+
+def _open_raw_connection():
+    """Open a brand-new PyMySQL connection (full TCP + auth handshake)."""
     if not DB_CONFIG:
         raise ConnectionError(f"Database configuration not loaded. Check file path: {CONFIG_FILE_PATH}")
 
     try:
-        return pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+        connect_args = {"connect_timeout": CONNECT_TIMEOUT, **DB_CONFIG}
+        return pymysql.connect(**connect_args, cursorclass=pymysql.cursors.DictCursor)
 
     except pymysql.err.MySQLError as err:
         # Catch PyMySQL-specific errors (like WinError 10061)
         raise ConnectionError(f"Failed to connect to MariaDB/MySQL database: {err}")
 
 
+class PooledConnection:
+    """
+    Thin proxy around a pooled PyMySQL connection.
+
+    Behaves like the raw connection (cursor, commit, rollback, ...), except that
+    close() hands the connection back to the pool instead of tearing it down, so
+    existing model code keeps working unchanged. Using the proxy after close()
+    raises InterfaceError instead of touching a connection someone else may hold.
+    """
+
+    def __init__(self, pool, raw_conn):
+        self._pool = pool
+        self._conn = raw_conn
+        self._released = False
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined on the proxy itself
+        if self._released:
+            # The raw connection may already belong to another thread
+            raise pymysql.err.InterfaceError("connection returned to pool")
+        return getattr(self._conn, name)
+
+    @property
+    def open(self):
+        return not self._released and self._conn.open
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)."""
+        if self._released:
+            return
+        self._released = True
+        raw_conn, self._conn = self._conn, None
+        self._pool.release(raw_conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # release() rolls back anything left uncommitted
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PyMySQL connections.
+
+    - At most `size` idle connections are kept; extra ones are closed on release.
+    - Every checkout pings the server; dead connections are dropped and replaced.
+    - Connections idle for longer than `idle_timeout` seconds are evicted.
+    """
+
+    def __init__(self, connect_func, size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT):
+        self._connect = connect_func
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self._idle = deque()  # (raw_conn, last_used_timestamp)
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now):
+        """Pop idle connections that exceeded the idle timeout (caller holds lock)."""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def acquire(self):
+        """Check out a healthy connection, reusing an idle one when possible."""
+        while True:
+            with self._lock:
+                expired = self._evict_expired(time.monotonic())
+                # Most recently used connection first: it is the most likely to be alive
+                raw_conn = self._idle.pop()[0] if self._idle else None
+
+            for conn in expired:
+                _close_quietly(conn)
+
+            if raw_conn is None:
+                return PooledConnection(self, self._connect())
+
+            try:
+                raw_conn.ping(reconnect=False)
+                return PooledConnection(self, raw_conn)
+            except Exception:
+                # Stale socket (server restart, network drop): discard and try the next one
+                _close_quietly(raw_conn)
+
+    def release(self, raw_conn):
+        """Take a connection back; roll back any open transaction first."""
+        try:
+            if not raw_conn.open:
+                return
+            if raw_conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                # Uncommitted work (or an open read snapshot) must not leak to the next user
+                raw_conn.rollback()
+        except Exception:
+            _close_quietly(raw_conn)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((raw_conn, time.monotonic()))
+                return
+        _close_quietly(raw_conn)
+
+    def clear(self):
+        """Close every idle connection (e.g. after a config change)."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw_conn, _ in idle:
+            _close_quietly(raw_conn)
+
+
+def _close_quietly(raw_conn):
+    try:
+        raw_conn.close()
+    except Exception:
+        pass
+
+
+_pool = ConnectionPool(_open_raw_connection)
+
+
 # ----------------------------------------------------------------------
-# LOCAL (SQLITE) CONNECTION AND INITIALIZATION
+# OFFLINE FAST-FAIL (CIRCUIT BREAKER)
 # ----------------------------------------------------------------------
+class CircuitBreaker:
+    """
+    Stops hammering an unreachable server.
+
+    - CLOSED: calls go through; consecutive connect failures are counted.
+    - OPEN: after `threshold` failures every call raises ConnectionError at once,
+      so the models fall back to the local SQLite cache in milliseconds.
+    - HALF_OPEN: a background thread re-probes after `retry_interval` seconds,
+      doubling the wait after each failed probe up to `max_retry_interval`, and
+      closes the breaker again as soon as a probe succeeds (the next outage starts
+      from `retry_interval` again).
+
+    It is the app's only record of whether the server is up: listeners added with
+    add_listener(callback) get True when it closes and False when it opens
+    (utils.network_utils and the auto-sync build on this).
+    """
 
-def get_local_connection():
-    """Creates and returns a connection to the local SQLite database."""
-    conn = sqlite3.connect(LOCAL_DB_PATH)
-    return conn
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, probe_func, threshold=BREAKER_FAILURE_THRESHOLD, retry_interval=BREAKER_RETRY_INTERVAL,
+                 max_retry_interval=BREAKER_MAX_RETRY_INTERVAL):
+        self._probe = probe_func
+        self.threshold = max(1, threshold)
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max(retry_interval, max_retry_interval)
+        self.state = self.CLOSED
+        self._failures = 0
+        self._last_error = None
+        self._lock = threading.Lock()
+        self._probe_thread = None
+        self._listeners = []
+
+    def before_call(self):
+        """Raise immediately while the breaker is open or half-open."""
+        if self.state != self.CLOSED:
+            raise ConnectionError(
+                f"Database offline (retrying in background). Last error: {self._last_error}"
+            )
+
+    def record_success(self):
+        with self._lock:
+            reopened = self.state != self.CLOSED
+            self._failures = 0
+            self.state = self.CLOSED
+        if reopened:
+            self._notify(True)
+
+    def record_failure(self, error, trip=False):
+        """Count a failed connect; `trip` opens the breaker at once (a failed explicit check)."""
+        with self._lock:
+            self._failures += 1
+            self._last_error = error
+            opened = self.state == self.CLOSED and (trip or self._failures >= self.threshold)
+            if opened:
+                self.state = self.OPEN
+                print(f"⚠️ Database circuit breaker OPEN after {self._failures} failure(s): {error}")
+                self._start_probe_thread()
+        if opened:
+            self._notify(False)
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, reachable):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(reachable)
+            except Exception as e:
+                print(f"Reachability listener error: {e}")
+
+    def _start_probe_thread(self):
+        # Caller holds the lock. _probe_thread is cleared (under the lock) by the loop
+        # itself when it exits, so a breaker that re-opens always gets a prober.
+        if self._probe_thread is not None:
+            return
+        self._probe_thread = threading.Thread(target=self._probe_loop, daemon=True)
+        self._probe_thread.start()
+
+    def _probe_loop(self):
+        delay = self.retry_interval
+        while True:
+            time.sleep(delay)
+            with self._lock:
+                if self.state == self.CLOSED:
+                    # A real connection (get_connection / check_database_connection) closed it meanwhile
+                    self._probe_thread = None
+                    return
+                self.state = self.HALF_OPEN
+            try:
+                self._probe()
+            except Exception as e:
+                with self._lock:
+                    if self.state == self.CLOSED:
+                        self._probe_thread = None
+                        return
+                    self.state = self.OPEN
+                    self._last_error = e
+                # Exponential backoff while the server stays down
+                delay = min(delay * 2, self.max_retry_interval)
+                continue
+
+            with self._lock:
+                reopened = self.state == self.HALF_OPEN
+                if reopened:
+                    self._failures = 0
+                    self.state = self.CLOSED
+                self._probe_thread = None
+            if reopened:
+                print("🟢 Database circuit breaker CLOSED: server reachable again.")
+                self._notify(True)
+            return
+
+
+def _probe_server():
+    """Background health check: open and immediately close a raw connection."""
+    _close_quietly(_open_raw_connection())
+
+
+_breaker = CircuitBreaker(_probe_server)
+
+
+def is_database_offline():
+    """True while the circuit breaker is short-circuiting MySQL calls."""
+    return _breaker.state != CircuitBreaker.CLOSED
+
+
+def check_database_connection():
+    """
+    Try a real connection now, even while the breaker is open, and record the
+    result on it (a failure opens it at once). Returns True if the server answered.
+    """
+    try:
+        conn = _pool.acquire()
+    except ConnectionError as e:
+        _breaker.record_failure(e, trip=True)
+        return False
+    conn.close()
+    _breaker.record_success()
+    return True
 
 
-def initialize_local_db():
-    """Creates the necessary tables in the local SQLite database if they don't exist."""
-    conn = get_local_connection()
-    cursor = conn.cursor()
-
-    # Table for offline user authentication
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS local_users
-                   (
-                       user_id
-                       INTEGER
-                       PRIMARY
-                       KEY,
-                       username
-                       TEXT
-                       NOT
-                       NULL
-                       UNIQUE,
-                       password_hash
-                       TEXT
-                       NOT
-                       NULL,
-                       full_name
-                       TEXT,
-                       role
-                       TEXT
-                   )
-                   """)
-
-    # Table for offline member lookup
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS local_members
-                   (
-                       member_id
-                       INTEGER
-                       PRIMARY
-                       KEY,
-                       membership_card_no
-                       TEXT
-                       NOT
-                       NULL
-                       UNIQUE,
-                       first_name
-                       TEXT,
-                       last_name
-                       TEXT
-                   )
-                   """)
-
-    # NEW Table for offline payment history lookup
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS local_membership
-                   (
-                       member_id
-                       INTEGER,
-                       payment_year
-                       INTEGER,
-                       payment_month_num
-                       INTEGER,
-                       PRIMARY
-                       KEY
-                   (
-                       member_id,
-                       payment_year,
-                       payment_month_num
-                   )
-                       )
-                   """)
-
-    conn.commit()
-    conn.close()
+def add_connection_listener(callback):
+    """Register callback(is_reachable), called whenever the breaker closes or opens."""
+    _breaker.add_listener(callback)
 
 
-# Automatic Initialization on Import
-try:
-    initialize_local_db()
-except Exception as e:
-    print(f"Warning: Failed to initialize local SQLite database: {e}")
+def remove_connection_listener(callback):
+    _breaker.remove_listener(callback)
+
 
 # ----------------------------------------------------------------------
-# EXISTING FUNCTIONS (WITH OFFLINE PAYMENT FALLBACK)
+# PRIMARY (MYSQL) CONNECTION FUNCTION
 # ----------------------------------------------------------------------
-# Constants for month conversion
-MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
-               "July", "August", "September", "October", "November", "December"]
+def get_connection():
+    """
+    Return a pooled database connection.
+    Calling close() on it returns it to the pool.
+    Raises ConnectionError immediately while the database is known to be offline.
+    """
+    _breaker.before_call()
+    try:
+        conn = _pool.acquire()
+    except ConnectionError as e:
+        _breaker.record_failure(e)
+        raise
+    _breaker.record_success()
+    return conn
 
 
-def get_paid_months_for_year(member_id, year):
+@contextmanager
+def pooled_connection():
     """
-    Retrieves paid months for a member. Tries MySQL first, then falls back to SQLite cache.
+    Context-manager form of get_connection():
+
+        with pooled_connection() as conn:
+            ...
+
+    Rolls back on error and always returns the connection to the pool.
     """
-    paid_month_names = set()
-    conn = None
-    cursor = None
+    conn = get_connection()
+    with conn:
+        yield conn
 
-    try:
-        # --- 1. TRY ONLINE (MYSQL) ---
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # SQL to select the month number (1-12) from the 'membership' table
-        sql = """
-              SELECT MONTH (payment_month) AS month_num
-              FROM membership
-              WHERE member_id = %s \
-                AND payment_year = %s \
-              """
-        params = (member_id, year)
-        cursor.execute(sql, params)
-        paid_month_numbers = [row['month_num'] for row in cursor.fetchall()]
-
-    except (ConnectionError, pymysql.err.MySQLError):
-        # --- 2. FALLBACK OFFLINE (SQLITE) ---
-        try:
-            conn = get_local_connection()
-            cursor = conn.cursor()
-
-            # Query the local cache table
-            sql = """
-                  SELECT payment_month_num \
-                  FROM local_membership
-                  WHERE member_id = ? \
-                    AND payment_year = ? \
-                  """
-            params = (member_id, year)
-            cursor.execute(sql, params)
-            paid_month_numbers = [row[0] for row in cursor.fetchall()]  # SQLite uses tuple indexing
-
-        except Exception as e:
-            # If the local DB fails, return empty set
-            print(f"Local Database Error fetching paid months: {e}")
-            return set()
-
-    except Exception as e:
-        print(f"Unhandled Database Error fetching paid months: {e}")
-        return set()
-
-    finally:
-        if cursor and hasattr(cursor, 'close'):
-            cursor.close()
-        if conn:
-            # Check connection type to close correctly
-            if isinstance(conn, pymysql.connections.Connection) and conn.open:
-                conn.close()
-            elif isinstance(conn, sqlite3.Connection):
-                conn.close()
-
-    # Convert month numbers (1-12) to names (Applies to both online/offline results)
-    for month_num in paid_month_numbers:
-        if 1 <= month_num <= 12:
-            paid_month_names.add(MONTH_NAMES[month_num - 1])
-
-    return paid_month_names
\ No newline at end of file
+
+# ----------------------------------------------------------------------
+# CONSTANTS
+# ----------------------------------------------------------------------
+# Constants for month conversion (paid-month lookups live in models/paid_months_model.py)
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
@@ -0,0 +1,415 @@
+"""
+The local SQLite cache (local_cache.db): one module owns its file, its schema and its connections.
+
+- The file lives in the per-user data directory (utils.paths.user_data_dir), whatever
+  the launch directory. Cache files left elsewhere by older versions are merged into
+  it once and renamed to *.merged.
+
+- The schema is versioned with `PRAGMA user_version` and upgraded once per process by
+  the steps in SCHEMA_MIGRATIONS, instead of CREATE TABLE IF NOT EXISTS on every call.
+- get_local_connection() returns one long-lived connection per thread. sqlite3 keeps
+  the prepared statements of each connection (cached_statements), so repeated offline
+  lookups skip both the file open and the SQL compile.
+- The file runs in WAL mode, so readers (the GUI's offline lookups) never wait for a
+  writer. All writes go through ONE writer thread (submit_write / run_write), so
+  writers never fight over the lock either.
+"""
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+from utils.paths import user_data_dir
+
+LOCAL_DB_FILENAME = "local_cache.db"
+LOCAL_DB_PATH = os.path.join(user_data_dir(), LOCAL_DB_FILENAME)
+
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Seconds run_write() waits for the writer thread before giving up
+LOCAL_WRITE_TIMEOUT = 30
+
+# Applied to every connection. WAL + synchronous=NORMAL: readers don't block on the
+# writer, and a commit no longer fsyncs (durable at the next checkpoint instead).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA mmap_size = 67108864",
+    "PRAGMA temp_store = MEMORY",
+)
+
+_thread_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+# ----------------------------------------------------------------------
+# CONNECTIONS
+# ----------------------------------------------------------------------
+class LocalConnection:
+    """
+    Per-thread shared SQLite connection.
+    close() does not close the file: it only rolls back anything the caller left
+    uncommitted, so the next user on this thread starts clean. Everything else is
+    delegated to the sqlite3 connection (rows are sqlite3.Row: index or key access).
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw.in_transaction:
+            self._raw.rollback()
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+
+def _open_raw_connection():
+    raw = sqlite3.connect(LOCAL_DB_PATH, cached_statements=STATEMENT_CACHE_SIZE)
+    raw.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        raw.execute(pragma)
+    return raw
+
+
+def get_local_connection():
+    """Return this thread's connection to the local cache (schema guaranteed current)."""
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None:
+        conn = LocalConnection(_open_raw_connection())
+        _ensure_schema(conn)
+        _thread_local.conn = conn
+    return conn
+
+
+# ----------------------------------------------------------------------
+# SINGLE WRITER
+# ----------------------------------------------------------------------
+class _LocalWriter:
+    """
+    One daemon thread with its own connection that performs every write to the cache,
+    in submission order. Each job is func(conn, *args, **kwargs); the writer commits
+    after it (or rolls back if it raises) and resolves the job's Future.
+    If the cache cannot be opened, the queued jobs fail with that error and the next
+    submit starts a fresh writer.
+    """
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def in_writer_thread(self):
+        return threading.current_thread() is self._thread
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        # Queued under the lock, so a writer that failed to start cannot miss it
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="local-cache-writer", daemon=True)
+                self._thread.start()
+            self._jobs.put((func, args, kwargs, future))
+        return future
+
+    def _run(self):
+        try:
+            conn = get_local_connection()
+        except Exception as e:
+            print(f"Error: local cache writer could not open {LOCAL_DB_PATH}: {e}")
+            with self._start_lock:
+                self._thread = None
+                while not self._jobs.empty():
+                    future = self._jobs.get()[3]
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+            return
+
+        while True:
+            func, args, kwargs, future = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(conn, *args, **kwargs)
+                conn.commit()
+            except BaseException as e:
+                conn.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+_writer = _LocalWriter()
+
+
+def submit_write(func, *args, **kwargs):
+    """
+    Queue func(conn, *args, **kwargs) on the writer thread; returns a Future.
+    The writer commits after func returns. Use for fire-and-forget cache updates.
+    """
+    return _writer.submit(func, *args, **kwargs)
+
+
+def run_write(func, *args, **kwargs):
+    """
+    Like submit_write(), but waits for and returns the result (re-raises its error).
+    Raises concurrent.futures.TimeoutError after LOCAL_WRITE_TIMEOUT seconds.
+    """
+    if _writer.in_writer_thread():
+        # Already on the writer (a job calling a helper that writes): run inline
+        return func(get_local_connection(), *args, **kwargs)
+    return submit_write(func, *args, **kwargs).result(timeout=LOCAL_WRITE_TIMEOUT)
+
+
+# ----------------------------------------------------------------------
+# SCHEMA (versioned with PRAGMA user_version)
+# ----------------------------------------------------------------------
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _migrate_to_1(conn):
+    """
+    Consolidated schema. Also upgrades caches written by the older per-module
+    initializers (unversioned files).
+    """
+    # Older local_members without the searchable fields: drop it, the next sync refills it
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(local_members)")]
+    rebuild_members = bool(columns) and "phone" not in columns
+    if rebuild_members:
+        conn.execute("DROP TABLE local_members")
+        conn.execute("DROP TABLE IF EXISTS local_members_fts")
+
+    # Users cached for offline login
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            full_name TEXT,
+            role TEXT
+        )
+    """)
+
+    # Members cached for offline lookup and the local search index (database/member_index.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_members (
+            member_id INTEGER PRIMARY KEY,
+            membership_card_no TEXT,
+            first_name TEXT,
+            last_name TEXT,
+            email TEXT,
+            phone TEXT,
+            nic_no TEXT,
+            date_of_birth TEXT,
+            join_date TEXT,
+            status TEXT
+        )
+    """)
+
+    # Synced membership payment history (one row per paid month)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_membership (
+            member_id INTEGER,
+            payment_year INTEGER,
+            payment_month_num INTEGER,
+            PRIMARY KEY (member_id, payment_year, payment_month_num)
+        )
+    """)
+
+    # High-water marks for incremental (delta) cache sync, one row per cached table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_sync_state (
+            table_name TEXT PRIMARY KEY,
+            last_value TEXT
+        )
+    """)
+
+    # Membership payments taken offline, waiting for sync/sync_manager to upload them
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS offline_membership (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            year INTEGER,
+            months TEXT,
+            total_amount REAL,
+            amount_per_month REAL,
+            created_at TEXT,
+            transaction_uuid TEXT UNIQUE
+        )
+    """)
+
+    if rebuild_members:
+        conn.execute("DELETE FROM local_sync_state WHERE table_name = 'local_members'")
+
+    # The old second offline queue was never uploaded: move its rows into offline_membership
+    if _table_exists(conn, "pending_membership_payments"):
+        pending = conn.execute("""
+            SELECT member_id, months, year, total_amount, created_at
+            FROM pending_membership_payments
+            WHERE COALESCE(synced, 0) = 0
+        """).fetchall()
+        queued = []
+        for member_id, months, year, total_amount, created_at in pending:
+            month_list = [m.strip() for m in (months or "").split(",") if m.strip()]
+            if not month_list:
+                continue
+            queued.append((member_id, int(year), ",".join(month_list), total_amount,
+                           round(float(total_amount) / len(month_list), 2),
+                           created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), str(uuid.uuid4())))
+        conn.executemany("""
+            INSERT INTO offline_membership (member_id, year, months, total_amount, amount_per_month,
+                                            created_at, transaction_uuid)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, queued)
+        conn.execute("DROP TABLE pending_membership_payments")
+
+
+def _migrate_to_2(conn):
+    """Paid-month bitmaps (models/paid_months_model.py): bit n-1 of `mask` set = month n paid."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_paid_months (
+            member_id INTEGER NOT NULL,
+            payment_type TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            mask INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (member_id, payment_type, year)
+        ) WITHOUT ROWID
+    """)
+
+
+# user_version -> upgrade step. Append new steps; never edit a released one.
+SCHEMA_MIGRATIONS = {
+    1: _migrate_to_1,
+    2: _migrate_to_2,
+}
+SCHEMA_VERSION = max(SCHEMA_MIGRATIONS)
+
+
+def _apply_schema_migrations(conn):
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version in range(current + 1, SCHEMA_VERSION + 1):
+        try:
+            SCHEMA_MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    with _schema_lock:
+        if _schema_ready:
+            return
+        _apply_schema_migrations(conn)
+        _merge_stray_caches(conn)
+        _schema_ready = True
+
+
+# ----------------------------------------------------------------------
+# ONE-TIME MERGE OF STRAY CACHE FILES
+# ----------------------------------------------------------------------
+# Older installed versions put local_cache.db next to wherever the app was started from.
+# Tables copied from such a file, with the columns to copy (never the local queue id).
+# local_sync_state is not copied: without watermarks the next sync re-reads in full.
+MERGED_TABLES = {
+    "local_users": "user_id, username, password_hash, full_name, role",
+    "local_members": "member_id, membership_card_no, first_name, last_name, email, phone, nic_no, "
+                     "date_of_birth, join_date, status",
+    "local_membership": "member_id, payment_year, payment_month_num",
+    "offline_membership": "member_id, year, months, total_amount, amount_per_month, created_at, transaction_uuid",
+}
+
+
+def _stray_cache_files():
+    """
+    local_cache.db files where older installed builds kept them: next to the executable
+    and in the launch directory (their relative path). Only for a frozen build: in a
+    source checkout local_cache.db is a developer file and is left alone.
+    """
+    if not getattr(sys, "frozen", False):
+        return []
+    directories = {os.path.dirname(os.path.abspath(sys.executable)), os.path.abspath(".")}
+
+    target = os.path.abspath(LOCAL_DB_PATH)
+    return sorted(path for path in (os.path.join(d, LOCAL_DB_FILENAME) for d in directories)
+                  if os.path.isfile(path) and os.path.abspath(path) != target)
+
+
+def _merge_stray_caches(conn):
+    """
+    Copy the rows of every stray cache file into this one (INSERT OR IGNORE, so rows
+    already here win), then rename the stray to *.merged so it is never read again.
+    Offline payments still queued in a stray are kept and uploaded by the next sync.
+    """
+    merged_any = False
+    for path in _stray_cache_files():
+        try:
+            # Bring the stray to the current schema first (older files are unversioned)
+            stray = sqlite3.connect(path)
+            try:
+                _apply_schema_migrations(stray)
+            finally:
+                stray.close()
+
+            conn.execute("ATTACH DATABASE ? AS stray", (path,))
+            try:
+                for table, columns in MERGED_TABLES.items():
+                    conn.execute(f"INSERT OR IGNORE INTO main.{table} ({columns}) "
+                                 f"SELECT {columns} FROM stray.{table}")
+                conn.commit()
+            finally:
+                conn.execute("DETACH DATABASE stray")
+
+            os.replace(path, path + ".merged")
+            merged_any = True
+            print(f"Merged stray local cache {path} into {LOCAL_DB_PATH}")
+        except Exception as e:
+            conn.rollback()
+            print(f"Warning: could not merge stray local cache {path}: {e}")
+
+    if merged_any:
+        # Rebuilt (with the merged members) by database/member_index.py on first use
+        conn.execute("DROP TABLE IF EXISTS local_members_fts")
+        conn.commit()
+
+
+# ----------------------------------------------------------------------
+# SYNC WATERMARKS
+# ----------------------------------------------------------------------
+def get_sync_watermark(table_name):
+    """Return the last synced high-water mark for a cached table (or None)."""
+    row = get_local_connection().execute("SELECT last_value FROM local_sync_state WHERE table_name = ?",
+                                         (table_name,)).fetchone()
+    return row[0] if row else None
+
+
+def set_sync_watermark(table_name, value, conn=None):
+    """
+    Store the high-water mark for a cached table.
+    Pass the writer's `conn` (inside a write job) to store it in the same SQLite
+    transaction as the cached rows.
+    """
+    if conn is None:
+        run_write(lambda writer_conn: set_sync_watermark(table_name, value, conn=writer_conn))
+        return
+    conn.execute("REPLACE INTO local_sync_state (table_name, last_value) VALUES (?, ?)",
+                 (table_name, None if value is None else str(value)))
@@ -0,0 +1,275 @@
+"""
+Local full-text member search (SQLite FTS5) over the offline member cache.
+
+`local_members_fts` shares its rowid with local_members.member_id and holds the
+searchable text: the full name, plus card, CNIC and phone reduced to letters and
+digits. It also stores the phone digits reversed, so typing the last digits of a
+number is a prefix search too. The member cache sync keeps it current through
+upsert_local_members(), and search_local_members() answers the member search box
+in a few milliseconds, online or offline.
+"""
+import difflib
+import re
+import sqlite3
+import threading
+
+from database.local_store import get_local_connection, run_write, submit_write
+
+FTS_TABLE = "local_members_fts"
+SEARCH_LIMIT = 50
+TYPO_CUTOFF = 0.75
+
+MEMBER_FIELDS = ("member_id", "membership_card_no", "first_name", "last_name", "email",
+                 "phone", "nic_no", "date_of_birth", "join_date", "status")
+
+_lock = threading.Lock()
+_fts_available = None
+_name_vocabulary = None  # Lower-cased name words for typo correction, rebuilt after writes
+
+
+# -----------------------------------------------------
+# 🧹 NORMALIZATION
+# -----------------------------------------------------
+def _alnum(value):
+    return re.sub(r"[^0-9A-Za-z]", "", str(value or "")).lower()
+
+
+def _digits(value):
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def _iso(value):
+    """Dates from MySQL are stored as ISO strings in the cache."""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _index_row(member):
+    phone = _digits(member.get("phone"))
+    return (
+        member["member_id"],
+        f"{member.get('first_name') or ''} {member.get('last_name') or ''}".strip(),
+        _alnum(member.get("membership_card_no")),
+        _digits(member.get("nic_no")),
+        phone,
+        phone[::-1],
+    )
+
+
+# -----------------------------------------------------
+# 🗄️ INDEX MAINTENANCE
+# -----------------------------------------------------
+def ensure_member_index(conn):
+    """
+    Create the FTS table if needed (filling it from local_members when it is new).
+    A write: call it with the writer's connection (run_write / inside a write job).
+    Returns False if this SQLite build has no FTS5; searches then use LIKE instead.
+    """
+    global _fts_available
+    if _fts_available is not None:
+        return _fts_available
+
+    with _lock:
+        if _fts_available is not None:
+            return _fts_available
+        try:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+                USING fts5(name, card, nic, phone, phone_rev,
+                           tokenize = "unicode61 remove_diacritics 2", prefix = '2 3')
+            """)
+            if not exists:
+                _reindex_all(conn)
+            _fts_available = True
+        except sqlite3.OperationalError as e:
+            print(f"Local member search index unavailable (no FTS5): {e}")
+            _fts_available = False
+    return _fts_available
+
+
+def _reindex_all(conn):
+    conn.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor = conn.execute(f"SELECT {', '.join(MEMBER_FIELDS)} FROM local_members")
+    members = [dict(zip(MEMBER_FIELDS, row)) for row in cursor.fetchall()]
+    conn.executemany(f"INSERT INTO {FTS_TABLE} (rowid, name, card, nic, phone, phone_rev) VALUES (?, ?, ?, ?, ?, ?)",
+                     [_index_row(m) for m in members])
+
+
+def upsert_local_members(conn, members):
+    """
+    Write member dicts (MySQL rows) into local_members and the search index.
+    Runs as (part of) a write job on the cache's writer thread, so the sync
+    commits the rows together with its watermark.
+    """
+    global _name_vocabulary
+    if not members:
+        return
+
+    indexed = ensure_member_index(conn)
+    conn.executemany(f"""
+        REPLACE INTO local_members ({', '.join(MEMBER_FIELDS)})
+        VALUES ({', '.join('?' for _ in MEMBER_FIELDS)})
+    """, [tuple(_iso(m.get(field)) for field in MEMBER_FIELDS) for m in members])
+
+    if indexed:
+        conn.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = ?", [(m["member_id"],) for m in members])
+        conn.executemany(f"INSERT INTO {FTS_TABLE} (rowid, name, card, nic, phone, phone_rev) VALUES (?, ?, ?, ?, ?, ?)",
+                         [_index_row(m) for m in members])
+
+    _name_vocabulary = None
+
+
+def replace_local_members(conn, members):
+    """
+    Make local_members and the search index hold exactly `members` (a full sync),
+    so members deleted on the server disappear from the cache too.
+    """
+    global _name_vocabulary
+    conn.execute("DELETE FROM local_members")
+    if ensure_member_index(conn):
+        conn.execute(f"DELETE FROM {FTS_TABLE}")
+    upsert_local_members(conn, members)
+    _name_vocabulary = None
+
+
+def rebuild_member_index():
+    """Rebuild the whole search index from local_members."""
+    global _name_vocabulary
+
+    def rebuild(conn):
+        if ensure_member_index(conn):
+            _reindex_all(conn)
+
+    run_write(rebuild)
+    _name_vocabulary = None
+
+
+# -----------------------------------------------------
+# 🔎 SEARCH
+# -----------------------------------------------------
+def _query_tokens(text):
+    """A number typed with dashes/spaces (CNIC, phone) is one token; otherwise split words."""
+    compact = re.sub(r"[\s\-+()]", "", text)
+    if compact.isdigit():
+        return [compact]
+    return [tok for tok in (_alnum(word) for word in text.split()) if tok]
+
+
+def _match_expression(tokens):
+    parts = []
+    for tok in tokens:
+        if tok.isdigit():
+            # Start of name/card/CNIC/phone, or the end of the phone number
+            parts.append(f'({{name card nic phone}} : "{tok}"* OR phone_rev : "{tok[::-1]}"*)')
+        else:
+            parts.append(f'{{name card nic phone}} : "{tok}"*')
+    return " AND ".join(parts)
+
+
+def _fts_search(conn, tokens, limit):
+    cursor = conn.execute(f"""
+        SELECT {', '.join('m.' + f for f in MEMBER_FIELDS)}
+        FROM {FTS_TABLE} f
+        JOIN local_members m ON m.member_id = f.rowid
+        WHERE {FTS_TABLE} MATCH ?
+        ORDER BY f.rank
+        LIMIT ?
+    """, (_match_expression(tokens), limit))
+    return [dict(zip(MEMBER_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def _like_search(conn, tokens, limit):
+    """Fallback when FTS5 is missing: substring match on the raw cache columns."""
+    clauses, params = [], []
+    for tok in tokens:
+        clauses.append("""(LOWER(first_name || ' ' || last_name) LIKE ? OR LOWER(membership_card_no) LIKE ?
+                           OR REPLACE(nic_no, '-', '') LIKE ? OR REPLACE(REPLACE(phone, '-', ''), ' ', '') LIKE ?)""")
+        params.extend([f"%{tok}%"] * 4)
+    cursor = conn.execute(f"SELECT {', '.join(MEMBER_FIELDS)} FROM local_members WHERE {' AND '.join(clauses)} LIMIT ?",
+                          (*params, limit))
+    return [dict(zip(MEMBER_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def _correct_typos(conn, tokens):
+    """Replace each word that matches no name with its closest known name word."""
+    global _name_vocabulary
+    if _name_vocabulary is None:
+        words = set()
+        for first, last in conn.execute("SELECT first_name, last_name FROM local_members"):
+            words.update(_alnum(w) for w in f"{first or ''} {last or ''}".split())
+        _name_vocabulary = sorted(w for w in words if w)
+
+    corrected = []
+    for tok in tokens:
+        if tok.isdigit():
+            corrected.append(tok)
+            continue
+        close = difflib.get_close_matches(tok, _name_vocabulary, n=1, cutoff=TYPO_CUTOFF)
+        corrected.append(close[0] if close else tok)
+    return corrected
+
+
+def member_matches(text, member):
+    """Python version of the index match (prefix per word), for narrowing cached results."""
+    words = [_alnum(w) for w in f"{member.get('first_name') or ''} {member.get('last_name') or ''}".split()]
+    phone = _digits(member.get("phone"))
+    fields = words + [_alnum(member.get("membership_card_no")), _digits(member.get("nic_no")), phone]
+
+    for tok in _query_tokens(text or ""):
+        if not any(f.startswith(tok) for f in fields if f) and not (tok.isdigit() and phone.endswith(tok)):
+            return False
+    return True
+
+
+def member_query_refines(old, new):
+    """
+    True if results for `new` are a subset of those for `old`: more typed at the end,
+    not ending in a number (a number can also match the end of a phone, which a
+    longer number does not narrow).
+    """
+    tokens = _query_tokens(new or "")
+    return new.startswith(old) and bool(tokens) and not tokens[-1].isdigit()
+
+
+def search_local_members(text, limit=SEARCH_LIMIT):
+    """
+    Search the local member cache by name, card, CNIC or phone.
+    Prefix matching on every word; if nothing matches, misspelt name words are
+    corrected against the known names and the search is retried.
+    A short number also matches the member ID exactly (listed first).
+    Returns member dicts (same keys as the members table), best match first.
+    """
+    tokens = _query_tokens(text or "")
+    if not tokens:
+        return []
+
+    # Creating the index is a write: queue it on the writer thread and use LIKE
+    # meanwhile, rather than waiting behind a sync that is writing
+    if _fts_available is None:
+        submit_write(ensure_member_index)
+    indexed = bool(_fts_available)
+
+    conn = get_local_connection()
+    try:
+        if indexed:
+            results = _fts_search(conn, tokens, limit)
+            if not results:
+                corrected = _correct_typos(conn, tokens)
+                if corrected != tokens:
+                    results = _fts_search(conn, corrected, limit)
+        else:
+            results = _like_search(conn, tokens, limit)
+
+        if len(tokens) == 1 and tokens[0].isdigit() and len(tokens[0]) < 7:
+            row = conn.execute(f"SELECT {', '.join(MEMBER_FIELDS)} FROM local_members WHERE member_id = ?",
+                               (int(tokens[0]),)).fetchone()
+            if row:
+                by_id = dict(zip(MEMBER_FIELDS, row))
+                results = [by_id] + [m for m in results if m["member_id"] != by_id["member_id"]]
+
+        return results
+    except sqlite3.Error as e:
+        print(f"Local member search error: {e}")
+        return []
+    finally:
+        conn.close()
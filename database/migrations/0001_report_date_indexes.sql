@@ -0,0 +1,4 @@
+-- Report filters (get_filtered_transactions, get_bag_offerings) use half-open
+-- date ranges; these indexes turn them into index range scans.
+CREATE INDEX idx_transactions_date_type ON transactions (transaction_date, transaction_type);
+CREATE INDEX idx_bag_offering_service_date ON bag_offering (service_date);
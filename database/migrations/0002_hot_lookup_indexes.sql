@@ -0,0 +1,10 @@
+-- Index pack for the hot lookup columns (member search, parking search,
+-- tithe/membership history). transactions(transaction_date, transaction_type)
+-- is created by 0001. Indexes whose columns are already the leading columns of
+-- an existing key (e.g. the UNIQUE keys on members) are skipped by the runner.
+CREATE INDEX idx_members_nic_no ON members (nic_no);
+CREATE INDEX idx_members_phone ON members (phone);
+CREATE INDEX idx_members_card_no ON members (membership_card_no);
+CREATE INDEX idx_parking_vehicle_number ON parking (vehicle_number);
+CREATE INDEX idx_tithe_member_id ON tithe (member_id);
+CREATE INDEX idx_membership_member_year ON membership (member_id, payment_year);
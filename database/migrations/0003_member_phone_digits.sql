@@ -0,0 +1,11 @@
+-- Normalized phone number for search_member_by_phone: digits only, maintained by
+-- the server on every insert/update. phone_digits_rev holds the same digits
+-- reversed so "ends with" searches can use an index too.
+ALTER TABLE members
+  ADD COLUMN phone_digits VARCHAR(50)
+    AS (REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '+', ''), '(', ''), ')', ''), '.', '')) STORED;
+ALTER TABLE members
+  ADD COLUMN phone_digits_rev VARCHAR(50)
+    AS (REVERSE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '+', ''), '(', ''), ')', ''), '.', ''))) STORED;
+CREATE INDEX idx_members_phone_digits ON members (phone_digits);
+CREATE INDEX idx_members_phone_digits_rev ON members (phone_digits_rev);
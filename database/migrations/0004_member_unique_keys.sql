@@ -0,0 +1,12 @@
+-- One member per email, phone, CNIC and membership card. add_member relies on
+-- these keys (duplicate-key error 1062) instead of a separate existence check.
+-- Servers created from the original dump already have them and skip these.
+CREATE UNIQUE INDEX uq_members_email ON members (email);
+CREATE UNIQUE INDEX uq_members_phone ON members (phone);
+CREATE UNIQUE INDEX uq_members_nic_no ON members (nic_no);
+CREATE UNIQUE INDEX uq_members_card_no ON members (membership_card_no);
+
+-- The plain lookup indexes from 0002 are redundant next to the unique keys
+DROP INDEX idx_members_nic_no ON members;
+DROP INDEX idx_members_phone ON members;
+DROP INDEX idx_members_card_no ON members;
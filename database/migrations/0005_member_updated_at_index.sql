@@ -0,0 +1,3 @@
+-- Incremental member reads (offline cache sync, the member picker directory)
+-- ask for rows changed since a watermark: WHERE updated_at >= ?
+CREATE INDEX idx_members_updated_at ON members (updated_at);
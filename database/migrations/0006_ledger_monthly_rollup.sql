@@ -0,0 +1,27 @@
+-- Ledger totals per (year, month, transaction type, expense type), kept current by
+-- the models' write paths (models/ledger_rollup_model.py) so reports read a few
+-- hundred rows instead of the whole ledger. expense_type is '' for non-expenses.
+CREATE TABLE IF NOT EXISTS ledger_monthly_rollup (
+  period_year SMALLINT NOT NULL,
+  period_month TINYINT NOT NULL,
+  transaction_type VARCHAR(32) NOT NULL,
+  expense_type VARCHAR(100) NOT NULL DEFAULT '',
+  income DECIMAL(14,2) NOT NULL DEFAULT 0,
+  expense DECIMAL(14,2) NOT NULL DEFAULT 0,
+  txn_count INT NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (period_year, period_month, transaction_type, expense_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Initial fill from the existing ledger (REPLACE, so re-running recomputes)
+REPLACE INTO ledger_monthly_rollup (period_year, period_month, transaction_type, expense_type,
+                                    income, expense, txn_count)
+SELECT YEAR(t.transaction_date), MONTH(t.transaction_date), COALESCE(t.transaction_type, ''),
+       COALESCE(e.expense_type, ''),
+       SUM(CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END),
+       SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END),
+       COUNT(*)
+FROM transactions t
+LEFT JOIN expenses e ON e.transaction_id = t.transaction_id
+GROUP BY YEAR(t.transaction_date), MONTH(t.transaction_date), COALESCE(t.transaction_type, ''),
+         COALESCE(e.expense_type, '');
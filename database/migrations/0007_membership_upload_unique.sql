@@ -0,0 +1,11 @@
+-- One membership row per uploaded month: the offline upload (sync/sync_manager.py)
+-- inserts with INSERT IGNORE and relies on this key to skip months already sent.
+-- Duplicates left by earlier overlapping uploads are removed first (the oldest row stays).
+DELETE newer FROM membership newer
+JOIN membership older
+  ON older.transaction_id = newer.transaction_id
+ AND older.payment_month = newer.payment_month
+ AND older.payment_year = newer.payment_year
+ AND older.membership_id < newer.membership_id;
+
+CREATE UNIQUE INDEX uq_membership_txn_month ON membership (transaction_id, payment_month, payment_year);
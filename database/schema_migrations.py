@@ -0,0 +1,338 @@
+"""
+Versioned schema migrations for the MySQL/MariaDB database.
+
+Migrations are plain SQL files in database/migrations named NNNN_description.sql.
+They are applied in order and recorded in the `schema_version` table, so each
+one runs once per server no matter how many desktop clients start up. main.py
+applies them before the login window opens. A migration that fails is reported
+and retried on the next start; it does not hold back the ones after it.
+
+    python -m database.schema_migrations            # apply pending migrations
+    python -m database.schema_migrations --status   # list applied / pending
+    python -m database.schema_migrations --explain  # apply, with a before/after EXPLAIN benchmark
+"""
+import os
+import re
+import sys
+import time
+
+import pymysql.err
+
+from database.db_connection import get_connection, resource_path, ConnectionError
+
+MIGRATIONS_DIR = resource_path(os.path.join("database", "migrations"))
+MIGRATION_FILE_RE = re.compile(r"^(\d+)_([\w\-]+)\.sql$")
+
+# Named lock so two clients starting at the same time don't both run a migration
+MIGRATION_LOCK_NAME = "churchapp_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 30
+
+# "Already done" errors: a migration re-applied by hand, or an object created outside the runner
+IGNORED_ERROR_CODES = {
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+    1091,  # Can't DROP; check that column/key exists
+}
+
+# Sample of duplicate values quoted when a unique key cannot be added
+DUPLICATE_SAMPLE_SIZE = 5
+
+CREATE_INDEX_RE = re.compile(
+    r"^\s*CREATE\s+(UNIQUE\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?\s*\(([^)]*)\)",
+    re.IGNORECASE
+)
+
+
+class MigrationError(Exception):
+    """A migration cannot be applied as things stand (e.g. duplicate data for a unique key)."""
+    pass
+
+
+# -----------------------------------------------------
+# 📂 MIGRATION FILES
+# -----------------------------------------------------
+def list_migrations(directory=MIGRATIONS_DIR):
+    """Return [(version, name, path), ...] sorted by version."""
+    if not os.path.isdir(directory):
+        return []
+
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    """Split a migration file into statements (strips `--` comment lines)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+# -----------------------------------------------------
+# 🗄️ VERSION TABLE
+# -----------------------------------------------------
+def ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_version")
+    return {row["version"] for row in cursor.fetchall()}
+
+
+# -----------------------------------------------------
+# ▶️ APPLYING
+# -----------------------------------------------------
+def _index_already_covered(cursor, statement):
+    """
+    True if `statement` is a CREATE INDEX whose columns are already the leading
+    columns of an existing index on that table (e.g. an older UNIQUE key). Avoids
+    piling duplicate indexes onto servers that were indexed by hand.
+    A CREATE UNIQUE INDEX is only covered by an existing unique key on exactly those columns.
+    """
+    match = CREATE_INDEX_RE.match(statement)
+    if not match:
+        return False
+
+    unique = bool(match.group(1))
+    table = match.group(3)
+    wanted = [col.strip().strip("`").split("(")[0].strip().lower() for col in match.group(4).split(",")]
+
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME, NON_UNIQUE
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+
+    existing = {}
+    non_unique = {}
+    for row in cursor.fetchall():
+        existing.setdefault(row["INDEX_NAME"], []).append(row["COLUMN_NAME"].lower())
+        non_unique[row["INDEX_NAME"]] = int(row["NON_UNIQUE"])
+
+    if unique:
+        return any(columns == wanted and not non_unique[name] for name, columns in existing.items())
+    return any(columns[:len(wanted)] == wanted for columns in existing.values())
+
+
+def _check_unique_data(cursor, statement):
+    """
+    Before a CREATE UNIQUE INDEX, look for values it would reject, and raise
+    MigrationError naming some of them instead of MySQL's bare duplicate-entry error.
+    """
+    match = CREATE_INDEX_RE.match(statement)
+    if not match or not match.group(1):
+        return
+
+    index, table = match.group(2), match.group(3)
+    columns = [col.strip().strip("`").split("(")[0].strip() for col in match.group(4).split(",")]
+    column_list = ", ".join(f"`{col}`" for col in columns)
+
+    cursor.execute(f"""
+        SELECT {column_list}, COUNT(*) AS copies
+        FROM `{table}`
+        WHERE {" AND ".join(f"`{col}` IS NOT NULL" for col in columns)}
+        GROUP BY {column_list}
+        HAVING COUNT(*) > 1
+        ORDER BY copies DESC
+        LIMIT %s
+    """, (DUPLICATE_SAMPLE_SIZE,))
+    duplicates = cursor.fetchall()
+    if not duplicates:
+        return
+
+    sample = "; ".join(
+        f"{', '.join(repr(row[col]) for col in columns)} ({row['copies']} rows)" for row in duplicates
+    )
+    raise MigrationError(
+        f"Cannot add unique key {index} on {table}({', '.join(columns)}): duplicate values exist, "
+        f"e.g. {sample}. Correct those records, then restart the application."
+    )
+
+
+def apply_migration(cursor, version, name, path):
+    with open(path, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+
+    for statement in statements:
+        if _index_already_covered(cursor, statement):
+            print(f"   ↷ skipped (already indexed): {statement.splitlines()[0]}")
+            continue
+        _check_unique_data(cursor, statement)
+        try:
+            cursor.execute(statement)
+        except pymysql.err.MySQLError as e:
+            if e.args and e.args[0] in IGNORED_ERROR_CODES:
+                print(f"   ↷ skipped ({e.args[1]})")
+                continue
+            raise
+
+    cursor.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (version, name))
+
+
+def run_migrations(conn=None):
+    """
+    Apply every pending migration. Returns (applied, failures): the versions
+    applied, and [(version, name, error message)] for those that failed.
+    MySQL commits DDL implicitly, so a failed migration is left pending and
+    retried (statement by statement, skipping what already exists) next time.
+    The migrations after it still run: each one must stand on its own.
+    """
+    own_conn = conn is None
+    applied = []
+    failures = []
+    try:
+        if own_conn:
+            conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if not cursor.fetchone()["locked"]:
+            print("Schema migrations skipped: another client is migrating.")
+            return applied, failures
+
+        try:
+            ensure_version_table(cursor)
+            done = get_applied_versions(cursor)
+
+            for version, name, path in list_migrations():
+                if version in done:
+                    continue
+                print(f"Applying migration {version:04d}_{name} ...")
+                try:
+                    apply_migration(cursor, version, name, path)
+                    conn.commit()
+                    applied.append(version)
+                except (MigrationError, pymysql.err.MySQLError) as e:
+                    conn.rollback()
+                    print(f"❌ Migration {version:04d}_{name} failed: {e}")
+                    failures.append((version, name, str(e)))
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+
+        return applied, failures
+
+    except ConnectionError as e:
+        print(f"Schema migrations skipped (offline): {e}")
+        return applied, failures
+    except Exception as e:
+        print(f"Error applying schema migrations: {e}")
+        failures.append((None, "migration runner", str(e)))
+        return applied, failures
+    finally:
+        if own_conn and conn:
+            conn.close()
+
+
+def migration_status(conn):
+    cursor = conn.cursor()
+    ensure_version_table(cursor)
+    done = get_applied_versions(cursor)
+    return [(version, name, version in done) for version, name, _ in list_migrations()]
+
+
+# -----------------------------------------------------
+# 📊 EXPLAIN BENCHMARK (hot lookups)
+# -----------------------------------------------------
+BENCHMARK_QUERIES = [
+    ("member by CNIC", "SELECT * FROM members WHERE nic_no = %s", ("00000-0000000-0",)),
+    ("member by phone", "SELECT * FROM members WHERE phone = %s", ("00000000000",)),
+    ("member by card", "SELECT * FROM members WHERE membership_card_no = %s", ("0",)),
+    ("parking by vehicle", "SELECT * FROM parking WHERE vehicle_number LIKE %s", ("ABC%",)),
+    ("tithes of member", "SELECT * FROM tithe WHERE member_id = %s", (1,)),
+    ("membership year", "SELECT payment_month FROM membership WHERE member_id = %s AND payment_year = %s",
+     (1, 2025)),
+    ("ledger month", """
+        SELECT transaction_type, SUM(amount) AS total
+        FROM transactions
+        WHERE transaction_date >= %s AND transaction_date < %s AND transaction_type = %s
+        GROUP BY transaction_type
+    """, ("2025-01-01", "2025-02-01", "tithe")),
+]
+
+
+def explain_queries(conn, repeat=5):
+    """
+    EXPLAIN each benchmark query and time it. Returns a list of dicts:
+    label, access type, key used, estimated rows, best-of-`repeat` time in ms.
+    """
+    results = []
+    cursor = conn.cursor()
+    for label, sql, params in BENCHMARK_QUERIES:
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()[0]
+
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+
+            results.append({
+                "label": label,
+                "type": plan.get("type"),
+                "key": plan.get("key"),
+                "rows": plan.get("rows"),
+                "ms": best,
+            })
+        except pymysql.err.MySQLError as e:
+            results.append({"label": label, "type": "error", "key": str(e), "rows": None, "ms": None})
+    return results
+
+
+def print_benchmark(before, after):
+    print(f"\n{'query':<20} {'before (type/key/rows/ms)':<45} {'after (type/key/rows/ms)':<45}")
+    print("-" * 110)
+
+    def fmt(r):
+        ms = f"{r['ms']:.2f}" if r["ms"] is not None else "-"
+        return f"{r['type']}/{r['key'] or '-'}/{r['rows']}/{ms}"
+
+    for b, a in zip(before, after):
+        print(f"{b['label']:<20} {fmt(b):<45} {fmt(a):<45}")
+
+
+# -----------------------------------------------------
+# 🖥️ CLI
+# -----------------------------------------------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    try:
+        conn = get_connection()
+    except ConnectionError as e:
+        print(f"Cannot connect to the database: {e}")
+        return 1
+
+    try:
+        if "--status" in argv:
+            for version, name, is_applied in migration_status(conn):
+                print(f"{version:04d}_{name:<40} {'applied' if is_applied else 'pending'}")
+            return 0
+
+        before = explain_queries(conn) if "--explain" in argv else None
+        applied, failures = run_migrations(conn)
+        print(f"Applied migrations: {applied or 'none (up to date)'}")
+        for version, name, error in failures:
+            print(f"Failed: {version or 0:04d}_{name}: {error}")
+        if before is not None:
+            print_benchmark(before, explain_queries(conn))
+        return 1 if failures else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
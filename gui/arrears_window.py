@@ -0,0 +1,170 @@
+from datetime import datetime
+
+from PySide6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableView, QComboBox, QHeaderView, QLineEdit, QMessageBox, QFileDialog
+)
+from PySide6.QtCore import Qt
+import pandas as pd
+
+from database.db_connection import MONTH_NAMES
+from gui.background_task import run_latest
+from gui.record_table_model import RecordTableModel, Column, format_amount
+from models.arrears_model import get_membership_arrears, default_through_month, arrears_period_label
+
+
+class ArrearsWindow(QMainWindow):
+    """Membership dues list: every active member with the months they still owe."""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Membership Arrears")
+        self.resize(1100, 700)
+
+        main_layout = QVBoxLayout()
+
+        # -------------------------
+        # Filter Section
+        # -------------------------
+        filter_layout = QHBoxLayout()
+        current_year = datetime.now().year
+
+        self.year_filter = QComboBox()
+        for y in range(current_year, current_year - 10, -1):
+            self.year_filter.addItem(str(y))
+        self.year_filter.currentTextChanged.connect(self._reset_through_month)
+
+        self.through_filter = QComboBox()
+        self.through_filter.addItems(MONTH_NAMES)
+
+        self.fee_input = QLineEdit()
+        self.fee_input.setPlaceholderText("Monthly fee (optional)")
+        self.fee_input.textChanged.connect(self._refresh_totals)
+
+        self.load_btn = QPushButton("Calculate")
+        self.load_btn.clicked.connect(self.load_arrears)
+
+        self.export_btn = QPushButton("📊 Export to Excel")
+        self.export_btn.clicked.connect(self.export_to_excel)
+
+        filter_layout.addWidget(QLabel("Year:"))
+        filter_layout.addWidget(self.year_filter)
+        filter_layout.addWidget(QLabel("Due through:"))
+        filter_layout.addWidget(self.through_filter)
+        filter_layout.addWidget(QLabel("Monthly Fee (Rs.):"))
+        filter_layout.addWidget(self.fee_input)
+        filter_layout.addWidget(self.load_btn)
+        filter_layout.addWidget(self.export_btn)
+        main_layout.addLayout(filter_layout)
+
+        # -------------------------
+        # Table Section
+        # -------------------------
+        self.table_model = RecordTableModel([
+            Column("Member ID", "member_id"),
+            Column("Name", "name"),
+            Column("Card No", "membership_card_no"),
+            Column("Phone", "phone"),
+            Column("Months Paid", "paid_count"),
+            Column("Months Due", "months_due", foreground=lambda r: Qt.red),
+            Column("Unpaid Months", "due_months"),
+            Column("Amount Due", lambda r: r["months_due"] * self._monthly_fee(),
+                   lambda v: format_amount(v, prefix="Rs. ")),
+        ])
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        main_layout.addWidget(self.table)
+
+        # -------------------------
+        # Summary Section
+        # -------------------------
+        self.summary_label = QLabel("")
+        main_layout.addWidget(self.summary_label)
+
+        container = QWidget()
+        container.setLayout(main_layout)
+        self.setCentralWidget(container)
+
+        self.current_arrears = []
+        self._online = True
+        self._load_task = None
+
+        self._reset_through_month(self.year_filter.currentText())
+        self.load_arrears()
+
+    # -------------------------------------------------
+    # 🔄 Load
+    # -------------------------------------------------
+    def _reset_through_month(self, year):
+        through = default_through_month(year)
+        self.through_filter.setCurrentIndex(max(through, 1) - 1)
+        self.through_filter.setEnabled(through > 0)
+
+    def _through_month(self):
+        year = int(self.year_filter.currentText())
+        if default_through_month(year) == 0:
+            return 0
+        return self.through_filter.currentIndex() + 1
+
+    def load_arrears(self):
+        self.summary_label.setText("Calculating arrears...")
+        year = int(self.year_filter.currentText())
+        run_latest(self, "_load_task", get_membership_arrears, year, self._through_month(),
+                   on_result=self._show_arrears, on_error=self._on_load_error)
+
+    def _show_arrears(self, result):
+        self._load_task = None
+        self.current_arrears, self._online = result
+        self.table_model.set_rows(self.current_arrears)
+        self._refresh_totals()
+
+    def _on_load_error(self, error):
+        self._load_task = None
+        self.summary_label.setText("")
+        QMessageBox.warning(self, "Database Error", f"Could not calculate arrears:\n{error}")
+
+    # -------------------------------------------------
+    # 📊 Totals
+    # -------------------------------------------------
+    def _monthly_fee(self):
+        try:
+            return max(float(self.fee_input.text().strip()), 0.0)
+        except ValueError:
+            return 0.0
+
+    def _refresh_totals(self):
+        total_months = sum(r["months_due"] for r in self.current_arrears)
+        period = arrears_period_label(self.year_filter.currentText(), self._through_month())
+        text = f"{period}: {len(self.current_arrears)} member(s) owe {total_months} month(s)"
+        if self._monthly_fee():
+            text += f" — Rs. {total_months * self._monthly_fee():,.2f}"
+        if not self._online:
+            text += "   (offline: from the local cache as of the last sync)"
+        self.summary_label.setText(text)
+        # Amount Due column depends on the fee
+        self.table.viewport().update()
+
+    # -------------------------------------------------
+    # 🟩 Export to Excel
+    # -------------------------------------------------
+    def export_to_excel(self):
+        if not self.current_arrears:
+            QMessageBox.warning(self, "No Data", "No arrears available to export.")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save Excel File", f"arrears_{self.year_filter.currentText()}.xlsx", "Excel Files (*.xlsx)"
+        )
+        if not file_path:
+            return
+
+        df = pd.DataFrame(self.current_arrears)
+        if self._monthly_fee():
+            df["amount_due"] = df["months_due"] * self._monthly_fee()
+
+        try:
+            df.to_excel(file_path, index=False)
+            QMessageBox.information(self, "Export Successful", f"Arrears exported to:\n{file_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", f"An error occurred:\n{e}")
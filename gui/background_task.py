@@ -0,0 +1,110 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+# Worker threads for model calls. Kept small: each running task holds one
+# pooled MySQL connection while it works.
+_thread_pool = QThreadPool()
+_thread_pool.setMaxThreadCount(4)
+
+# Strong references to in-flight tasks so their signal objects survive until delivery
+_active_tasks = set()
+
+
+class _TaskSignals(QObject):
+    """
+    Lives in the GUI thread. The worker emits `done` from its own thread; Qt queues
+    the call so `_deliver` (and the user's callbacks) always run on the GUI thread.
+    """
+    done = Signal(bool, object)
+
+    def __init__(self, task):
+        super().__init__()
+        self._task = task
+        self.done.connect(self._deliver)
+
+    @Slot(bool, object)
+    def _deliver(self, ok, payload):
+        task = self._task
+        _active_tasks.discard(task)
+        if task.cancelled:
+            return
+
+        callback = task.on_result if ok else task.on_error
+        try:
+            if callback:
+                callback(payload)
+            elif not ok:
+                print(f"Background task error: {payload}")
+        except RuntimeError as e:
+            # Target window was already destroyed; nothing left to update
+            print(f"Background task result dropped: {e}")
+
+
+class BackgroundTask(QRunnable):
+    """
+    Runs func(*args, **kwargs) on a worker thread and hands the result to
+    on_result (or the exception to on_error) on the GUI thread.
+
+    cancel() does not interrupt a running query; it guarantees the result is
+    discarded, which is what a window needs when the user refilters.
+    """
+
+    def __init__(self, func, *args, on_result=None, on_error=None, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.cancelled = False
+        self.signals = _TaskSignals(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            _active_tasks.discard(self)
+            return
+        try:
+            result = self.func(*self.args, **self.kwargs)
+            ok = True
+        except Exception as e:
+            result, ok = e, False
+
+        try:
+            self.signals.done.emit(ok, result)
+        except RuntimeError:
+            # Application is shutting down and the signal object is gone
+            _active_tasks.discard(self)
+
+
+def run_in_background(func, *args, on_result=None, on_error=None, **kwargs):
+    """
+    Schedule a (blocking) model call off the GUI thread.
+    Returns the BackgroundTask so the caller can cancel() it later.
+    """
+    task = BackgroundTask(func, *args, on_result=on_result, on_error=on_error, **kwargs)
+    task.setAutoDelete(False)
+    _active_tasks.add(task)
+    _thread_pool.start(task)
+    return task
+
+
+def run_latest(owner, attr, func, *args, on_result=None, on_error=None, **kwargs):
+    """
+    run_in_background() for a query whose newest call is the only one that matters
+    (refiltering, typing, reloading): cancels the task stored in owner.<attr>, so its
+    stale result is dropped, and stores the new one there. Returns the new task.
+    """
+    cancel_task(owner, attr)
+    task = run_in_background(func, *args, on_result=on_result, on_error=on_error, **kwargs)
+    setattr(owner, attr, task)
+    return task
+
+
+def cancel_task(owner, attr):
+    """Cancel the task stored in owner.<attr> by run_latest(), if any."""
+    task = getattr(owner, attr, None)
+    if task:
+        task.cancel()
+        setattr(owner, attr, None)
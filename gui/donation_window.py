@@ -1,13 +1,27 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QDialog,
+    QTableView, QHeaderView, QMessageBox, QDialog,
     QFormLayout, QLineEdit, QComboBox, QTextEdit
 )
 from datetime import datetime
 from models.donation_model import get_donations_by_member, add_donation_payment
 from gui.receipt_dialog import ReceiptDialog
+from gui.background_task import run_latest
+from gui.member_picker import MemberPicker
+from gui.record_table_model import RecordTableModel, Column, format_amount, format_date
+from database.db_connection import PAGE_SIZE
 import app_state
 
+
+def donation_donor(d):
+    """(name, phone) for a church member or a non-member donor."""
+    if d.get("first_name") or d.get("last_name"):  # Church member
+        return f"{d.get('first_name') or ''} {d.get('last_name') or ''}".strip(), d.get("phone") or ""
+    elif d.get("donor_name"):  # Non-member
+        return d.get("donor_name"), d.get("donor_phone") or ""
+    return "-", ""
+
+
 class DonationWindow(QMainWindow):
     def __init__(self, member=None):
         super().__init__()
@@ -26,12 +40,18 @@ class DonationWindow(QMainWindow):
         layout = QVBoxLayout()
 
         # 🧱 Table setup (added Phone column)
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            "Donation ID", "Transaction ID", "Member / Donor",
-            "Phone", "Type", "Amount", "Date", "Comment"
+        self.table_model = RecordTableModel([
+            Column("Donation ID", "donation_id", lambda v: "" if v is None else str(v)),
+            Column("Transaction ID", "transaction_id", lambda v: "" if v is None else str(v)),
+            Column("Member / Donor", lambda d: donation_donor(d)[0]),
+            Column("Phone", lambda d: donation_donor(d)[1], lambda v: v),
+            Column("Type", "donation_type", lambda v: str(v or "").capitalize()),
+            Column("Amount", "amount", lambda v: format_amount(v, prefix="Rs. ")),
+            Column("Date", "donation_date", format_date),
+            Column("Comment", "comment", lambda v: v or ""),
         ])
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.table)
 
@@ -44,43 +64,28 @@ class DonationWindow(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # Background query currently feeding the table (cancelled when superseded)
+        self._load_task = None
+
         self.load_donations()
 
     def load_donations(self):
-        """Load and display all donations with member or non-member details."""
+        """Load and display donations with member or non-member details (off the GUI thread)."""
         if self.all_members_mode:
-            from models.donation_model import get_all_donations
-            donations = get_all_donations()
+            # Newest page first; older pages load as the table is scrolled
+            from models.donation_model import get_donations_page
+            query, args = get_donations_page, ()
+            on_result = lambda rows: self.table_model.set_rows(rows, page_loader=get_donations_page,
+                                                               page_size=PAGE_SIZE)
         else:
             from models.donation_model import get_donations_by_member
-            donations = get_donations_by_member(self.member["member_id"])
+            query, args = get_donations_by_member, (self.member["member_id"],)
+            on_result = self.table_model.set_rows
 
-        self.table.setRowCount(0)
+        run_latest(self, "_load_task", query, *args, on_result=on_result, on_error=self._on_load_error)
 
-        for d in donations:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            # --- Determine donor name and phone ---
-            if d.get("first_name") or d.get("last_name"):  # Church member
-                donor_name = f"{d.get('first_name', '')} {d.get('last_name', '')}".strip()
-                donor_phone = d.get("phone", "")
-            elif d.get("donor_name"):  # Non-member
-                donor_name = d.get("donor_name")
-                donor_phone = d.get("donor_phone", "")
-            else:
-                donor_name = "-"
-                donor_phone = ""
-
-            # --- Fill table ---
-            self.table.setItem(row, 0, QTableWidgetItem(str(d.get("donation_id", ""))))
-            self.table.setItem(row, 1, QTableWidgetItem(str(d.get("transaction_id", ""))))
-            self.table.setItem(row, 2, QTableWidgetItem(donor_name))
-            self.table.setItem(row, 3, QTableWidgetItem(donor_phone))
-            self.table.setItem(row, 4, QTableWidgetItem(str(d.get("donation_type", "")).capitalize()))
-            self.table.setItem(row, 5, QTableWidgetItem(f"Rs. {float(d.get('amount', 0)):.2f}"))
-            self.table.setItem(row, 6, QTableWidgetItem(str(d.get("donation_date", ""))))
-            self.table.setItem(row, 7, QTableWidgetItem(d.get("comment", "") or ""))
+    def _on_load_error(self, error):
+        QMessageBox.warning(self, "Database Error", f"Could not load donations:\n{error}")
 
     def open_add_donation_dialog(self):
         dialog = AddDonationDialog(self.member)
@@ -106,14 +111,7 @@ class AddDonationDialog(QDialog):
         # --- Member dropdown (only for all-member mode) ---
         self.member_dropdown = None
         if not member.get("member_id"):  # All-members mode
-            from models.member_model import get_all_members
-            members = get_all_members()
-
-            self.member_dropdown = QComboBox()
-            for m in members:
-                full_name = f"{m['first_name']} {m['last_name']}"
-                self.member_dropdown.addItem(full_name, m["member_id"])
-
+            self.member_dropdown = MemberPicker()
             layout.addRow("Select Member:", self.member_dropdown)
 
         # --- Non-member fields ---
@@ -185,9 +183,10 @@ class AddDonationDialog(QDialog):
             if self.member.get("member_id"):  # from member window
                 member_id = self.member["member_id"]
                 member_name = f"{self.member['first_name']} {self.member['last_name']}"
-            elif self.member_dropdown:  # all-member mode
-                member_id = self.member_dropdown.currentData()
-                member_name = self.member_dropdown.currentText()
+            elif self.member_dropdown and self.member_dropdown.selected_member():  # all-member mode
+                picked = self.member_dropdown.selected_member()
+                member_id = picked["member_id"]
+                member_name = f"{picked['first_name']} {picked['last_name']}"
             else:
                 QMessageBox.warning(self, "Missing Info", "Please select a member.")
                 return
@@ -0,0 +1,151 @@
+from datetime import datetime
+
+from PySide6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableView, QComboBox, QHeaderView, QMessageBox
+)
+from PySide6.QtCore import Qt
+
+from gui.background_task import run_in_background, run_latest
+from gui.record_table_model import RecordTableModel, Column, format_amount
+from models.ledger_rollup_model import get_monthly_finance, get_annual_finance, rebuild_ledger_rollup
+
+LEDGER_TYPES = ["membership", "tithe", "donation", "bag_offering", "parking", "thanksgiving", "expense"]
+
+
+def _net_color(row):
+    return Qt.red if (row.get("net") or 0) < 0 else Qt.darkGreen
+
+
+class FinanceSummaryWindow(QMainWindow):
+    """Month-by-month and year-by-year income / expense, read from the ledger rollup."""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Finance Summary")
+        self.resize(1200, 750)
+
+        main_layout = QVBoxLayout()
+
+        # -------------------------
+        # Filter Section
+        # -------------------------
+        filter_layout = QHBoxLayout()
+        self.year_filter = QComboBox()
+        current_year = datetime.now().year
+        for y in range(current_year, current_year - 10, -1):
+            self.year_filter.addItem(str(y))
+        self.year_filter.currentTextChanged.connect(self.load_monthly)
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.load_all)
+        self.rebuild_btn = QPushButton("Rebuild Totals")
+        self.rebuild_btn.clicked.connect(self.rebuild_totals)
+
+        filter_layout.addWidget(QLabel("Year:"))
+        filter_layout.addWidget(self.year_filter)
+        filter_layout.addStretch()
+        filter_layout.addWidget(self.refresh_btn)
+        filter_layout.addWidget(self.rebuild_btn)
+        main_layout.addLayout(filter_layout)
+
+        # -------------------------
+        # Monthly Table (net per type, then the month's totals)
+        # -------------------------
+        amount = lambda v: format_amount(v or 0)
+        self.monthly_model = RecordTableModel(
+            [Column("Month", "month_name")]
+            + [Column(t.replace("_", " ").capitalize(), f"net_{t}", amount) for t in LEDGER_TYPES]
+            + [
+                Column("Income", "income", amount),
+                Column("Expense", "expense", amount),
+                Column("Net", "net", amount, foreground=_net_color),
+                Column("Transactions", "count"),
+            ]
+        )
+        self.monthly_table = QTableView()
+        self.monthly_table.setModel(self.monthly_model)
+        self.monthly_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        main_layout.addWidget(self.monthly_table)
+
+        self.annual_label = QLabel("")
+        self.annual_label.setStyleSheet("font-weight: bold;")
+        main_layout.addWidget(self.annual_label)
+
+        # -------------------------
+        # Year-by-year Table
+        # -------------------------
+        main_layout.addWidget(QLabel("All Years:"))
+        self.annual_model = RecordTableModel([
+            Column("Year", "year"),
+            Column("Income", "income", amount),
+            Column("Expense", "expense", amount),
+            Column("Net", "net", amount, foreground=_net_color),
+            Column("Transactions", "count"),
+        ])
+        self.annual_table = QTableView()
+        self.annual_table.setModel(self.annual_model)
+        self.annual_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.annual_table.setMaximumHeight(220)
+        main_layout.addWidget(self.annual_table)
+
+        container = QWidget()
+        container.setLayout(main_layout)
+        self.setCentralWidget(container)
+
+        self._monthly_task = None
+        self._annual_task = None
+        self.load_all()
+
+    # -------------------------------------------------
+    # 🔄 Load
+    # -------------------------------------------------
+    def load_all(self):
+        self.load_monthly()
+        run_latest(self, "_annual_task", get_annual_finance, on_result=self.annual_model.set_rows,
+                   on_error=self._on_load_error)
+
+    def load_monthly(self):
+        self.statusBar().showMessage("Loading...")
+        run_latest(self, "_monthly_task", get_monthly_finance, self.year_filter.currentText(),
+                   on_result=self.show_monthly, on_error=self._on_load_error)
+
+    def show_monthly(self, result):
+        self.statusBar().clearMessage()
+        months, annual = result
+        self.monthly_model.set_rows(months)
+        self.annual_label.setText(
+            f"{self.year_filter.currentText()} Total — Income: Rs. {annual['income']:.2f}   "
+            f"Expense: Rs. {annual['expense']:.2f}   Net: Rs. {annual['net']:.2f}   "
+            f"({annual['count']} transactions)"
+        )
+
+    def _on_load_error(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Database Error", f"Could not load the finance summary:\n{error}")
+
+    # -------------------------------------------------
+    # 🛠️ Rebuild
+    # -------------------------------------------------
+    def rebuild_totals(self):
+        answer = QMessageBox.question(
+            self, "Rebuild Totals",
+            "Recalculate all monthly totals from the full transaction ledger?\n"
+            "Only needed after transactions were edited directly in the database."
+        )
+        if answer != QMessageBox.Yes:
+            return
+
+        self.rebuild_btn.setEnabled(False)
+        self.statusBar().showMessage("Rebuilding totals...")
+        run_in_background(rebuild_ledger_rollup, on_result=self._on_rebuilt, on_error=self._on_rebuild_error)
+
+    def _on_rebuilt(self, rows):
+        self.rebuild_btn.setEnabled(True)
+        self.statusBar().showMessage(f"Totals rebuilt ({rows} monthly rows).", 5000)
+        self.load_all()
+
+    def _on_rebuild_error(self, error):
+        self.rebuild_btn.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Rebuild Failed", f"Could not rebuild totals:\n{error}")
@@ -7,10 +7,10 @@ from gui.member_window import MemberWindow
 from gui.transaction_view_window import TransactionViewWindow
 from datetime import datetime
 import app_state
-from sync.sync_manager import sync_offline_data
-from sync.sync_manager import start_auto_sync
+from sync.sync_manager import start_auto_sync, is_sync_running
 # Assuming sync_manager also has a way to get the current status text
 from sync.sync_manager import get_current_sync_status  # <-- ASSUMING THIS EXISTS
+from gui.background_task import run_in_background
 import pymysql as mysql
 
 
@@ -70,7 +70,10 @@ class MainWindow(QMainWindow):
 
         create_button("Add / View Thanksgiving", self.open_thanksgiving_window, 2, 0)
         create_button("Add / View Parking Fee", self.open_parking_window, 2, 1)
-        create_button("Sync Data", self.sync_offline_data, 2, 2)
+        self.sync_btn = create_button("Sync Data", self.sync_offline_data, 2, 2)
+        create_button("Membership Arrears", self.open_arrears_window, 2, 3)
+
+        create_button("Finance Summary", self.open_finance_summary_window, 3, 0)
 
         # Note: The original code had a duplicate "Backup Database" button at 2,2. Removed one here.
         # create_button("Backup Database", self.open_backup_window, 2, 2)
@@ -83,11 +86,9 @@ class MainWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # Initial sync check and background timer start
-        success, message = sync_offline_data()
-        self.update_sync_status_label()  # Update label immediately after manual sync attempt
-        print("🔄 Initial sync status:", message)
-
+        # The auto-sync thread's first pass is the startup sync (off the GUI thread,
+        # so the dashboard opens immediately)
+        self._sync_task = None
         start_auto_sync(interval=300)
 
     def update_sync_status_label(self):
@@ -104,6 +105,9 @@ class MainWindow(QMainWindow):
             # Fallback if get_current_sync_status is not yet implemented or returns None
             self.sync_status_label.setText("🔄 Sync Status: Monitoring...")
 
+        # No second upload while one (manual or automatic) is still running
+        self.sync_btn.setEnabled(self._sync_task is None and not is_sync_running())
+
     # --- Button Actions (All remain unchanged) ---
     def open_member_window(self):
         self.member_window = MemberWindow()
@@ -144,6 +148,16 @@ class MainWindow(QMainWindow):
         self.parking_window = ParkingWindow()
         self.parking_window.show()
 
+    def open_arrears_window(self):
+        from gui.arrears_window import ArrearsWindow
+        self.arrears_window = ArrearsWindow()
+        self.arrears_window.show()
+
+    def open_finance_summary_window(self):
+        from gui.finance_summary_window import FinanceSummaryWindow
+        self.finance_summary_window = FinanceSummaryWindow()
+        self.finance_summary_window.show()
+
     def open_transaction_view(self):
         self.transaction_window = TransactionViewWindow()
         self.transaction_window.show()
@@ -155,7 +169,19 @@ class MainWindow(QMainWindow):
 
     def sync_offline_data(self):
         from sync.sync_manager import sync_offline_data
-        success, message = sync_offline_data()
+        self.sync_btn.setEnabled(False)
+        self.sync_status_label.setText("🔄 Sync Status: Manually triggered sync...")
+        self._sync_task = run_in_background(sync_offline_data, on_result=self._on_manual_sync,
+                                            on_error=self._on_manual_sync_error)
+
+    def _on_manual_sync_error(self, error):
+        self._sync_task = None
+        self.update_sync_status_label()
+        QMessageBox.warning(self, "Sync Failed", f"⚠️ {error}")
+
+    def _on_manual_sync(self, result):
+        success, message = result
+        self._sync_task = None
         self.update_sync_status_label()  # Update label after manual sync
         if success:
             QMessageBox.information(self, "Sync Complete", f"✅ {message}")
@@ -0,0 +1,114 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QComboBox, QCompleter
+
+from gui.background_task import run_in_background
+from models.member_model import get_member_directory
+
+MEMBER_ID_ROLE = Qt.UserRole
+
+
+def member_label(member):
+    """Picker text: full name plus card number, which tells apart members with the same name."""
+    name = f"{member.get('first_name') or ''} {member.get('last_name') or ''}".strip() or "-"
+    card = member.get("membership_card_no")
+    return f"{name} ({card})" if card else f"{name} (#{member['member_id']})"
+
+
+class MemberDirectory:
+    """
+    Session-wide list of members (ID, name, card only) shared by every member picker.
+
+    The first picker loads it once; later pickers only ask for members changed since
+    the newest `updated_at` seen, so opening a payment dialog does not re-download
+    the congregation. Refreshes run in the background and update the shared model
+    in place, which every open picker sees.
+    """
+
+    def __init__(self):
+        self.model = QStandardItemModel()
+        self._items = {}  # member_id -> QStandardItem
+        self._members = {}  # member_id -> directory row
+        self._watermark = None
+        self._task = None
+
+    def refresh(self):
+        """Fetch members added or changed since the last refresh (no-op while one is running)."""
+        if self._task:
+            return
+        self._task = run_in_background(get_member_directory, self._watermark,
+                                       on_result=self._merge, on_error=self._on_error)
+
+    def _merge(self, members):
+        self._task = None
+        for member in members:
+            item = self._items.get(member["member_id"])
+            if item is None:
+                item = QStandardItem()
+                item.setEditable(False)
+                self._items[member["member_id"]] = item
+                self.model.appendRow(item)
+            item.setText(member_label(member))
+            item.setData(member["member_id"], MEMBER_ID_ROLE)
+            self._members[member["member_id"]] = member
+
+            if member.get("updated_at") and (self._watermark is None or member["updated_at"] > self._watermark):
+                self._watermark = member["updated_at"]
+
+        if members:
+            self.model.sort(0)
+
+    def member(self, member_id):
+        return self._members.get(member_id)
+
+    def _on_error(self, error):
+        self._task = None
+        print(f"Could not load member directory: {error}")
+
+
+_directory = None
+
+
+def member_directory():
+    """The shared MemberDirectory (created on first use)."""
+    global _directory
+    if _directory is None:
+        _directory = MemberDirectory()
+    return _directory
+
+
+class MemberPicker(QComboBox):
+    """
+    Editable member combo box over the shared directory. Typing filters the list
+    (any part of the name or card number); nothing is selected until the user picks.
+    """
+
+    def __init__(self, parent=None, placeholder="Select Member"):
+        super().__init__(parent)
+        directory = member_directory()
+
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setModel(directory.model)
+        self.setPlaceholderText(placeholder)
+        self.lineEdit().setPlaceholderText(placeholder)
+        self.setCurrentIndex(-1)
+
+        completer = QCompleter(directory.model, self)
+        completer.setFilterMode(Qt.MatchContains)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        self.setCompleter(completer)
+
+        directory.refresh()
+
+    def selected_member(self):
+        """Directory row (member_id, first_name, last_name, membership_card_no) or None."""
+        index = self.currentIndex()
+        if index < 0 or self.itemText(index) != self.currentText():
+            return None  # Nothing picked, or the text was edited away from the pick
+        return member_directory().member(self.itemData(index, MEMBER_ID_ROLE))
+
+    def selected_member_id(self):
+        member = self.selected_member()
+        return member["member_id"] if member else None
@@ -1,29 +1,37 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QPushButton, QLabel, QMessageBox, QDialog,
-    QFormLayout, QDateEdit, QTableWidget, QTableWidgetItem, QHeaderView
+    QFormLayout, QDateEdit, QTableView, QHeaderView
 )
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtCore import Qt, QDate, QTimer
 from PySide6.QtWidgets import QMenu
 
 # --- Core Model Imports ---
 from models.member_model import (
-    search_member_by_name,
     add_member,
-    get_all_members,
-    search_member_by_id,
-    search_member_by_cnic,
-    search_member_by_card_number,
-    search_member_by_phone  # <-- NEW IMPORT
+    get_members_page,
+    search_members_on_server,
+    member_search_cache
 )
 # --- Transaction Window Imports ---
 from gui.membership_window import MembershipWindow
 from gui.donation_window import DonationWindow
 from gui.tithe_window import TitheWindow
 from gui.thanksgiving_window import ThanksgivingWindow
+from gui.background_task import run_latest, cancel_task
+from database.db_connection import PAGE_SIZE
+from database.member_index import search_local_members, SEARCH_LIMIT
+from gui.record_table_model import RecordTableModel, Column, format_date
+from utils.network_utils import is_database_reachable
 
 
 class MemberWindow(QMainWindow):
+    # Column of the "+" cell that opens the transaction menu
+    ACTIONS_COLUMN = 9
+    # Search-as-you-type: wait this long after the last keystroke, and for at least this many characters
+    SEARCH_DEBOUNCE_MS = 250
+    SEARCH_MIN_CHARS = 2
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Member Management")
@@ -34,9 +42,17 @@ class MemberWindow(QMainWindow):
         # --- Search Section ---
         search_layout = QHBoxLayout()
         self.search_box = QLineEdit()
-        self.search_box.setPlaceholderText("Enter name, ID, CNIC (13 digits), or Card # ...")
+        self.search_box.setPlaceholderText("Enter name, ID, CNIC, phone, or Card # ...")
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.search_member)
+        self.search_box.returnPressed.connect(self.search_member)
+
+        # Restarted on every keystroke; fires once typing pauses
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.search_as_you_type)
+        self.search_box.textChanged.connect(lambda _text: self._search_timer.start())
         self.refresh_button = QPushButton("Refresh")
         self.refresh_button.clicked.connect(self.load_all_members)
 
@@ -46,13 +62,23 @@ class MemberWindow(QMainWindow):
         main_layout.addLayout(search_layout)
 
         # --- Table to display members ---
-        self.member_table = QTableWidget()
-        self.member_table.setColumnCount(10)
-        self.member_table.setHorizontalHeaderLabels([
-            "ID", "First Name", "Last Name", "Email", "Phone",
-            "Membership Card #", "NIC Number", "Date of Birth", "Join Date", "Actions"
+        self.member_model = RecordTableModel([
+            Column("ID", "member_id"),
+            Column("First Name", "first_name"),
+            Column("Last Name", "last_name"),
+            Column("Email", "email"),
+            Column("Phone", "phone"),
+            Column("Membership Card #", "membership_card_no"),
+            Column("NIC Number", "nic_no"),
+            Column("Date of Birth", "date_of_birth", format_date),
+            Column("Join Date", "join_date", format_date),
+            Column("Actions", lambda m: "+"),
         ])
+        self.member_table = QTableView()
+        self.member_table.setModel(self.member_model)
         self.member_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # The "+" cell opens the transaction menu for that member
+        self.member_table.clicked.connect(self.on_table_clicked)
         main_layout.addWidget(self.member_table)
 
         # --- Add Member Button ---
@@ -65,89 +91,122 @@ class MemberWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+        # Background query currently feeding the table (cancelled when superseded)
+        self._load_task = None
+
         # Load data initially
         self.load_all_members()
 
+    # ---------------- BACKGROUND LOADING ----------------
+    def _run_query(self, func, *args, on_result):
+        """Run a model query off the GUI thread, dropping any older pending query."""
+        self.statusBar().showMessage("Loading members...")
+        run_latest(self, "_load_task", func, *args, on_result=on_result, on_error=self._on_query_error)
+
+    def _on_query_error(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Database Error", f"Could not load members:\n{error}")
+
     # ---------------- LOAD ALL MEMBERS ----------------
     def load_all_members(self):
-        """Fetch and display all members in the table."""
+        """Fetch the first page of members; further pages load as the table is scrolled."""
+        self._search_timer.stop()
+        self.search_box.blockSignals(True)
         self.search_box.clear()
-        members = get_all_members()
-        self.populate_table(members)
+        self.search_box.blockSignals(False)
+        self._run_query(get_members_page, on_result=self.populate_first_page)
+
+    def populate_first_page(self, members):
+        self.statusBar().clearMessage()
+        self.member_model.set_rows(
+            members,
+            page_loader=lambda last: get_members_page(last["member_id"]),
+            page_size=PAGE_SIZE
+        )
 
     # ---------------- SEARCH MEMBER ----------------
-    def search_member(self):
+    def _local_search(self, keyword):
+        """Local index search, served from / stored in member_search_cache."""
+        key = keyword.lower()
+        members = member_search_cache.get(key)
+        if members is None:
+            members = search_local_members(keyword)
+            # A full page may be cut off by the limit, so it cannot be narrowed later
+            member_search_cache.put(key, members, complete=len(members) < SEARCH_LIMIT)
+        return members
+
+    def search_as_you_type(self):
+        """Debounced search while typing. Local index and cache only; no server round trips."""
         keyword = self.search_box.text().strip()
         if not keyword:
-            QMessageBox.warning(self, "Search Error", "Please enter a name, ID, card number, or CNIC to search.")
+            self.load_all_members()
+            return
+        if len(keyword) < self.SEARCH_MIN_CHARS:
             return
 
-        members = []
-
-        # --- PREPROCESSING STEP: Clean the keyword for numeric checks ---
-        cleaned_keyword = keyword.replace('-', '').replace(' ', '')
-
-        # --- ROBUST SEARCH LOGIC ---
-
-        if cleaned_keyword.isdigit():
-            # If the cleaned keyword is purely numeric
-
-            if len(cleaned_keyword) == 13:
-                # 1. CNIC Search (Strict 13-digit match)
-                members = search_member_by_cnic(cleaned_keyword)
+        cancel_task(self, "_load_task")
+        members = self._local_search(keyword)
+        self.member_model.set_rows(members)
+        self.statusBar().showMessage(
+            f"{len(members)} member(s) found" if members else "No local matches - press Enter to search the server"
+        )
 
-            elif len(cleaned_keyword) >= 7 and len(cleaned_keyword) <= 12:
-                # 2. Phone Number Search (7 to 12 digits, covering local and mobile)
-                members = search_member_by_phone(cleaned_keyword)
+    def search_member(self):
+        self._search_timer.stop()
+        keyword = self.search_box.text().strip()
+        if not keyword:
+            QMessageBox.warning(self, "Search Error", "Please enter a name, ID, card number, or CNIC to search.")
+            return
 
-            elif len(cleaned_keyword) < 6:
-                # 3. Member ID Search (Short numeric match)
-                members = search_member_by_id(int(cleaned_keyword))
+        # A still-running "load all" must not overwrite the search results
+        cancel_task(self, "_load_task")
 
+        # Local full-text index first: prefix/typo-tolerant over name, card, CNIC and
+        # phone, and shown straight away. It is only as fresh as the last sync, so when
+        # the server is reachable its answer follows and takes precedence.
+        members = self._local_search(keyword)
+        if not is_database_reachable():
+            if members:
+                self.populate_table(members)
             else:
-                # 4. Numeric fallback: try card number, then name
-                # Use original keyword for card search as it might include formatting
-                card_results = search_member_by_card_number(keyword)
-                members = card_results if card_results else search_member_by_name(keyword)
-
-        else:
-            # 5. Alphanumeric/Dashed search (Card Number or Name)
-            # Try card number first (partial match)
-            card_results = search_member_by_card_number(keyword)
-            members = card_results if card_results else search_member_by_name(keyword)
+                self._show_no_results()
+            return
 
-        # --- END ROBUST SEARCH LOGIC ---
+        if members:
+            self.member_model.set_rows(members)
+        self._run_query(search_members_on_server, keyword,
+                        on_result=lambda data: self._show_server_results(keyword, members, data))
 
+    def _show_server_results(self, keyword, local_members, server_members):
+        """Server rows replace their stale local copies; local-only index hits are kept."""
+        found = {member["member_id"] for member in server_members}
+        members = list(server_members) + [m for m in local_members if m["member_id"] not in found]
         if not members:
-            QMessageBox.information(self, "No Results", "No members found for your search criteria.")
-            self.member_table.setRowCount(0)
+            self._show_no_results()
             return
 
+        # Server matching differs from the local index, so only reuse it for this exact query
+        member_search_cache.put(keyword.lower(), members, complete=False)
         self.populate_table(members)
 
+    def _show_no_results(self):
+        self.statusBar().clearMessage()
+        QMessageBox.information(self, "No Results", "No members found for your search criteria.")
+        self.member_model.set_rows([])
+
     # ---------------- POPULATE TABLE ----------------
     def populate_table(self, members):
-        self.member_table.setRowCount(0)
-        for row_index, member in enumerate(members):
-            self.member_table.insertRow(row_index)
-            self.member_table.setItem(row_index, 0, QTableWidgetItem(str(member["member_id"])))
-            self.member_table.setItem(row_index, 1, QTableWidgetItem(member["first_name"]))
-            self.member_table.setItem(row_index, 2, QTableWidgetItem(member["last_name"]))
-            self.member_table.setItem(row_index, 3, QTableWidgetItem(member["email"]))
-            self.member_table.setItem(row_index, 4, QTableWidgetItem(member["phone"]))
-            self.member_table.setItem(row_index, 5, QTableWidgetItem(member["membership_card_no"]))
-            self.member_table.setItem(row_index, 6, QTableWidgetItem(member["nic_no"]))
-            self.member_table.setItem(row_index, 7, QTableWidgetItem(str(member["date_of_birth"])))
-            self.member_table.setItem(row_index, 8, QTableWidgetItem(str(member["join_date"])))
-
-            # --- Action Button (+) ---
-            action_btn = QPushButton("+")
-            # action_btn.clicked.connect(lambda checked, m=member: self.show_action_menu(m))
-            action_btn.clicked.connect(lambda checked, m=member, b=action_btn: self.show_action_menu(m, b))
-            self.member_table.setCellWidget(row_index, 9, action_btn)
-
-    # def show_action_menu(self, member):
-    def show_action_menu(self, member, action_btn):
+        self.statusBar().clearMessage()
+        self.member_model.set_rows(members)
+
+    def on_table_clicked(self, index):
+        if index.column() != self.ACTIONS_COLUMN:
+            return
+        member = self.member_model.row_at(index.row())
+        cell_rect = self.member_table.visualRect(index)
+        self.show_action_menu(member, self.member_table.viewport().mapToGlobal(cell_rect.bottomLeft()))
+
+    def show_action_menu(self, member, position):
         """Displays a context menu for transaction actions."""
         menu = QMenu()
         menu.addAction("Membership", lambda: self.open_membership_window(member))
@@ -155,8 +214,7 @@ class MemberWindow(QMainWindow):
         menu.addAction("Donation", lambda: self.open_donation_window(member))
         menu.addAction("Thanksgiving", lambda: self.open_thanksgiving_window(member))
 
-        # menu.exec(self.sender().mapToGlobal(self.sender().rect().bottomLeft()))
-        menu.exec(action_btn.mapToGlobal(action_btn.rect().bottomLeft()))
+        menu.exec(position)
 
     def open_membership_window(self, member):
         """Open the membership management window for this member."""
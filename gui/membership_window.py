@@ -10,6 +10,7 @@ from models.membership_model import add_membership_payment, get_paid_months_for_
 # from models.member_model import
 from models.membership_model import get_paid_months_for_year
 from models.membership_model import get_memberships_by_member
+from models.paid_months_model import get_member_paid_months, mask_to_month_numbers
 
 
 class MembershipWindow(QMainWindow):
@@ -101,6 +102,8 @@ class AddMembershipDialog(QDialog):
         self.year_combo.currentTextChanged.connect(self.load_months_list)
 
         # ----- Month Multi-Select -----
+        # Every year's paid months in one fetch; switching the year needs no query
+        self.paid_masks = get_member_paid_months(member['member_id'])
         self.months_list = QListWidget()
         self.months_list.setSelectionMode(QAbstractItemView.MultiSelection)
         self.load_months_list(current_year)
@@ -126,7 +129,7 @@ class AddMembershipDialog(QDialog):
             "January", "February", "March", "April", "May", "June",
             "July", "August", "September", "October", "November", "December"
         ]
-        paid_months = get_paid_months_for_member(self.member['member_id'], selected_year)
+        paid_months = mask_to_month_numbers(self.paid_masks.get(("membership", int(selected_year)), 0))
         unpaid_months = [m for i, m in enumerate(months, start=1) if i not in paid_months]
 
         for m in unpaid_months:
@@ -1,16 +1,27 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit, QComboBox, QPushButton,
-    QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QHBoxLayout, QCheckBox,
+    QMessageBox, QTableView, QHeaderView, QHBoxLayout, QCheckBox,
     QListWidget, QAbstractItemView
 )
 from datetime import datetime
-from models.parking_model import add_parking_payment, get_all_parking, search_parking_by_vehicle
+from PySide6.QtCore import QTimer
+from models.parking_model import (
+    add_parking_payment, get_parking_page, search_parking_by_vehicle, parking_search_cache
+)
+from database.db_connection import PAGE_SIZE
 from gui.receipt_dialog import ReceiptDialog
+from gui.background_task import run_latest, cancel_task
+from gui.record_table_model import RecordTableModel, Column, format_amount, format_date
 from models.member_model import search_member_by_card_number, search_member_by_id
+from models.paid_months_model import get_member_paid_months, paid_month_names, months_to_mask
 import app_state
 
 
 class ParkingWindow(QMainWindow):
+    # Search-as-you-type: wait this long after the last keystroke, and for at least this many characters
+    SEARCH_DEBOUNCE_MS = 300
+    SEARCH_MIN_CHARS = 2
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Parking Fee Management")
@@ -24,6 +35,14 @@ class ParkingWindow(QMainWindow):
         self.search_box.setPlaceholderText("Enter Vehicle # to search (e.g. LEB-1234)")
         self.search_btn = QPushButton("Search")
         self.search_btn.clicked.connect(self.search_parking)
+        self.search_box.returnPressed.connect(self.search_parking)
+
+        # Restarted on every keystroke; fires once typing pauses
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.search_as_you_type)
+        self.search_box.textChanged.connect(lambda _text: self._search_timer.start())
         self.refresh_btn = QPushButton("Refresh")
         self.refresh_btn.clicked.connect(self.load_parking)
 
@@ -44,6 +63,8 @@ class ParkingWindow(QMainWindow):
         self.member_info_label = QLabel("")
 
         self.selected_member_id = None
+        self.selected_member_name = ""
+        self.member_paid_masks = {}  # Paid-month bitmaps of the looked-up member
 
         # 2. Vehicle Details
         self.vehicle_number = QLineEdit()
@@ -74,6 +95,7 @@ class ParkingWindow(QMainWindow):
         for y in range(current_year - 2, current_year + 3):
             self.year_combo.addItem(str(y))
         self.year_combo.setCurrentText(str(current_year))
+        self.year_combo.currentTextChanged.connect(self.show_member_parking_months)
 
         # 4. Amount
         self.amount_input = QLineEdit()
@@ -112,11 +134,19 @@ class ParkingWindow(QMainWindow):
         main_layout.addWidget(self.add_btn)
 
         # --- Parking Table ---
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            "Trans ID", "Date", "Vehicle #", "Type", "Amount", "Payment Period", "Phone", "Member"
+        self.table_model = RecordTableModel([
+            Column("Trans ID", "transaction_id"),
+            Column("Date", "transaction_date", format_date),
+            Column("Vehicle #", "vehicle_number"),
+            Column("Type", "vehicle_type"),
+            Column("Amount", "amount", format_amount),
+            Column("Payment Period",
+                   lambda r: f"{r.get('payment_month') or ''} {r.get('payment_year') or ''}".strip()),
+            Column("Phone", "phone_number", lambda v: v or ""),
+            Column("Member", lambda r: f"{r.get('first_name') or ''} {r.get('last_name') or ''}".strip()),
         ])
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         main_layout.addWidget(self.table)
 
@@ -124,6 +154,9 @@ class ParkingWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+        # Background query currently feeding the table (cancelled when superseded)
+        self._load_task = None
+
         # Load all records initially
         self.load_parking()
         # Initialize default price
@@ -137,6 +170,7 @@ class ParkingWindow(QMainWindow):
         self.member_info_label.setVisible(checked)
         if not checked:
             self.selected_member_id = None
+            self.member_paid_masks = {}
             self.member_info_label.setText("")
             self.member_search.clear()
         self.set_default_price()  # Update price based on new mode
@@ -156,15 +190,29 @@ class ParkingWindow(QMainWindow):
 
         if member:
             self.selected_member_id = member['member_id']
-            self.member_info_label.setText(f"✅ Member Found: {member['first_name']} {member['last_name']}")
+            self.selected_member_name = f"{member['first_name']} {member['last_name']}"
+            self.member_paid_masks = get_member_paid_months(member['member_id'])
             self.member_info_label.setStyleSheet("color: green;")
+            self.show_member_parking_months()
             self.set_default_price()
         else:
             self.selected_member_id = None
+            self.member_paid_masks = {}
             self.member_info_label.setText("❌ Member Not Found")
             self.member_info_label.setStyleSheet("color: red;")
             self.set_default_price()
 
+    def show_member_parking_months(self):
+        """Member found: list the months of the selected year they already paid parking for."""
+        if self.selected_member_id is None:
+            return
+        year = self.year_combo.currentText()
+        paid = paid_month_names(self.member_paid_masks, "parking", year)
+        self.member_info_label.setText(
+            f"✅ Member Found: {self.selected_member_name}"
+            f" — parking paid for {year}: {', '.join(paid) if paid else 'none'}"
+        )
+
     def uppercase_vehicle_number(self):
         current = self.vehicle_number.text()
         self.vehicle_number.blockSignals(True)
@@ -195,38 +243,68 @@ class ParkingWindow(QMainWindow):
 
     # --- Load Parking Table ---
     def load_parking(self):
-        data = get_all_parking()
-        self.populate_table(data)
+        """Load the newest page of records; older pages load as the table is scrolled."""
+        self._run_query(get_parking_page, on_result=self.populate_first_page)
+
+    def populate_first_page(self, data):
+        self.statusBar().clearMessage()
+        self.table_model.set_rows(
+            data,
+            page_loader=lambda last: get_parking_page(last["parking_id"]),
+            page_size=PAGE_SIZE
+        )
+
+    def _run_query(self, func, *args, on_result, on_error=None):
+        """Run a model query off the GUI thread, dropping any older pending query."""
+        self.statusBar().showMessage("Loading parking records...")
+        run_latest(self, "_load_task", func, *args, on_result=on_result, on_error=on_error or self._on_query_error)
+
+    def _on_query_error(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Database Error", f"Could not load parking records:\n{error}")
 
     def populate_table(self, data):
-        self.table.setRowCount(0)
-        for row in data:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QTableWidgetItem(str(row.get("transaction_id", "-"))))
-            self.table.setItem(r, 1, QTableWidgetItem(str(row["transaction_date"])))
-            self.table.setItem(r, 2, QTableWidgetItem(row["vehicle_number"]))
-            self.table.setItem(r, 3, QTableWidgetItem(row["vehicle_type"]))
-            self.table.setItem(r, 4, QTableWidgetItem(f"{row['amount']:.2f}"))
-
-            period = f"{row.get('payment_month', '')} {row.get('payment_year', '')}"
-            self.table.setItem(r, 5, QTableWidgetItem(period.strip()))
-
-            self.table.setItem(r, 6, QTableWidgetItem(str(row.get("phone_number", ""))))
-            name = f"{row.get('first_name', '')} {row.get('last_name', '')}".strip()
-            self.table.setItem(r, 7, QTableWidgetItem(name if name else "-"))
+        self.statusBar().clearMessage()
+        self.table_model.set_rows(data)
 
     # --- Search Parking by Vehicle Number ---
+    def search_as_you_type(self):
+        """Debounced search while typing: cached/narrowed results show instantly, no popups."""
+        vehicle_number = self.search_box.text().strip().upper()
+        if not vehicle_number:
+            self.load_parking()
+            return
+        if len(vehicle_number) < self.SEARCH_MIN_CHARS:
+            return
+
+        cached = parking_search_cache.get(vehicle_number)
+        if cached is not None:
+            cancel_task(self, "_load_task")
+            self._show_typed_results(vehicle_number, cached)
+            return
+
+        self._run_query(search_parking_by_vehicle, vehicle_number,
+                        on_result=lambda data: self._show_typed_results(vehicle_number, data),
+                        on_error=lambda e: self.statusBar().showMessage(f"Search failed: {e}"))
+
+    def _show_typed_results(self, vehicle_number, data):
+        self.table_model.set_rows(data)
+        self.statusBar().showMessage(f"{len(data)} record(s) matching '{vehicle_number}'")
+
     def search_parking(self):
+        self._search_timer.stop()
         vehicle_number = self.search_box.text().strip().upper()
         if not vehicle_number:
             QMessageBox.warning(self, "Input Error", "Please enter a vehicle number to search.")
             return
 
-        data = search_parking_by_vehicle(vehicle_number)
+        self._run_query(search_parking_by_vehicle, vehicle_number,
+                        on_result=lambda data: self._show_search_results(vehicle_number, data))
+
+    def _show_search_results(self, vehicle_number, data):
+        self.populate_table(data)
         if not data:
             QMessageBox.information(self, "No Results", f"No records found for '{vehicle_number}'.")
-        self.populate_table(data)
 
     # --- Save Parking Payment ---
     def save_parking(self):
@@ -284,6 +362,11 @@ class ParkingWindow(QMainWindow):
             receipt_dialog = ReceiptDialog("Parking Receipt", receipt_text)
             receipt_dialog.exec()
 
+            if member_id:
+                key = ("parking", int(year))
+                self.member_paid_masks[key] = self.member_paid_masks.get(key, 0) | months_to_mask(months)
+                self.show_member_parking_months()
+
             self.vehicle_number.clear()
             self.phone_number.clear()
             self.month_list.clearSelection()
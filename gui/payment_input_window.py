@@ -8,7 +8,8 @@ from datetime import datetime
 
 # --- UPDATED IMPORTS ---
 # Import the function and constants from the new db_connection file
-from database.db_connection import get_paid_months_for_year, MONTH_NAMES
+from database.db_connection import MONTH_NAMES
+from models.paid_months_model import get_member_paid_months, paid_month_names
 
 
 class PaymentInputWindow(QDialog):
@@ -41,6 +42,9 @@ class PaymentInputWindow(QDialog):
         self.month_list.setSelectionMode(QAbstractItemView.MultiSelection)
         self.month_list.setFixedHeight(150)
 
+        # Paid months of every year in one fetch (local cache when offline)
+        self.paid_masks = get_member_paid_months(member_info['member_id'])
+
         main_layout.addLayout(form)
         main_layout.addWidget(QLabel("Select Unpaid Month(s):"))
         main_layout.addWidget(self.month_list)
@@ -62,12 +66,9 @@ class PaymentInputWindow(QDialog):
         self._update_month_list()  # Initial population
 
     def _update_month_list(self):
-        """Filters out paid months for the selected year using live DB data."""
+        """Filters out paid months for the selected year (from the paid-month bitmaps)."""
         selected_year = int(self.year_input.currentText())
-        member_id = self.member_info['member_id']
-
-        # CALLS THE LIVE DB FUNCTION
-        paid_months = get_paid_months_for_year(member_id, selected_year)
+        paid_months = paid_month_names(self.paid_masks, "membership", selected_year)
 
         # Filtering logic
         unpaid_months = [month for month in self.ALL_MONTHS if month not in paid_months]
@@ -0,0 +1,174 @@
+from datetime import date, datetime
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from gui.background_task import run_in_background
+
+
+# -----------------------------------------------------
+# 🧮 COLUMN FORMATTERS
+# -----------------------------------------------------
+def format_text(value, empty="-"):
+    return empty if value is None or value == "" else str(value)
+
+
+def format_amount(value, prefix=""):
+    """12.5 -> '12.50' (or 'Rs. 12.50' with prefix='Rs. ')."""
+    try:
+        return f"{prefix}{float(value or 0):.2f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def format_date(value):
+    if value is None or value == "":
+        return "-"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def format_month_name(value):
+    """Render a DATE / 'YYYY-MM-DD' string / month number as 'January' etc."""
+    if value is None or value == "":
+        return "-"
+    try:
+        if isinstance(value, (date, datetime)):
+            return value.strftime("%B")
+        if isinstance(value, int):
+            return date(2000, value, 1).strftime("%B")
+        return datetime.strptime(str(value), "%Y-%m-%d").strftime("%B")
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class Column:
+    """
+    One grid column.
+    key:        dict key, or a callable(row) -> value for computed columns
+    formatter:  callable(value) -> display string (default: format_text)
+    foreground: optional callable(row) -> Qt color for the cell text
+    """
+
+    def __init__(self, header, key, formatter=format_text, foreground=None):
+        self.header = header
+        self.key = key
+        self.formatter = formatter
+        self.foreground = foreground
+
+    def value(self, row):
+        if callable(self.key):
+            return self.key(row)
+        return row.get(self.key)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Read-only table model over the list of dict rows the model functions return.
+
+    Nothing is pre-built per cell: the view asks data() only for the rows it is
+    painting, and rows are exposed to the view in batches (canFetchMore/fetchMore)
+    as the user scrolls, so even a very large ledger opens instantly.
+
+    When set_rows() is given a page_loader, scrolling past the last loaded row also fetches the
+    next server page in the background (keyset pagination, see get_*_page()).
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._rows = []
+        self._visible = 0
+        self._page_loader = None
+        self._page_size = 0
+        self._has_more_pages = False
+        self._page_task = None
+
+    # ---------- data management ----------
+    def set_rows(self, rows, page_loader=None, page_size=0):
+        """
+        Replace the rows. If `page_loader` is given, rows is treated as the first
+        page and page_loader(last_row) is called for each following page.
+        """
+        if self._page_task:
+            self._page_task.cancel()
+            self._page_task = None
+
+        self.beginResetModel()
+        self._rows = list(rows or [])
+        self._visible = min(self.BATCH_SIZE, len(self._rows))
+        self._page_loader = page_loader
+        self._page_size = page_size
+        self._has_more_pages = bool(page_loader) and len(self._rows) >= page_size
+        self.endResetModel()
+
+    def rows(self):
+        return self._rows
+
+    def row_at(self, row_index):
+        return self._rows[row_index]
+
+    # ---------- lazy population ----------
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._visible < len(self._rows) or (self._has_more_pages and self._page_task is None)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        remaining = len(self._rows) - self._visible
+        count = min(self.BATCH_SIZE, remaining)
+        if count > 0:
+            self.beginInsertRows(QModelIndex(), self._visible, self._visible + count - 1)
+            self._visible += count
+            self.endInsertRows()
+        elif self._has_more_pages and self._page_task is None:
+            self._page_task = run_in_background(self._page_loader, self._rows[-1] if self._rows else None,
+                                                on_result=self._append_page, on_error=self._on_page_error)
+
+    def _append_page(self, rows):
+        self._page_task = None
+        rows = list(rows or [])
+        self._has_more_pages = len(rows) >= self._page_size
+        if not rows:
+            return
+        self._rows.extend(rows)
+        self.fetchMore()
+
+    def _on_page_error(self, error):
+        self._page_task = None
+        self._has_more_pages = False
+        print(f"Could not load next page: {error}")
+
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._visible
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.DisplayRole:
+            return column.formatter(column.value(row))
+        if role == Qt.ForegroundRole and column.foreground:
+            return column.foreground(row)
+        if role == Qt.UserRole:
+            return row
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return str(section + 1)
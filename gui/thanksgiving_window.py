@@ -9,7 +9,7 @@ from models.thanksgiving_model import (
     get_thanksgivings_by_member,
     get_all_thanksgivings
 )
-from models.member_model import get_all_members
+from gui.member_picker import MemberPicker
 from gui.receipt_dialog import ReceiptDialog
 import app_state
 
@@ -40,10 +40,7 @@ class ThanksgivingWindow(QMainWindow):
         # --- Member Dropdown (for All-Members Mode) ---
         self.member_dropdown = None
         if self.all_members_mode:
-            self.member_dropdown = QComboBox()
-            self.member_dropdown.addItem("Select Member", None)
-            for m in get_all_members():
-                self.member_dropdown.addItem(f"{m['first_name']} {m['last_name']}", m["member_id"])
+            self.member_dropdown = MemberPicker()
             self.member_dropdown.currentIndexChanged.connect(self.on_member_change)
             layout.addWidget(QLabel("Select Member:"))
             layout.addWidget(self.member_dropdown)
@@ -134,7 +131,7 @@ class ThanksgivingWindow(QMainWindow):
 
     # --- When user changes member in dropdown ---
     def on_member_change(self):
-        selected_member_id = self.member_dropdown.currentData()
+        selected_member_id = self.member_dropdown.selected_member_id()
         if selected_member_id:
             from models.member_model import search_member_by_id
             result = search_member_by_id(selected_member_id)
@@ -160,7 +157,7 @@ class ThanksgivingWindow(QMainWindow):
         # Member donor
         if donor_type == "Church Member":
             if self.all_members_mode:
-                member_id = self.member_dropdown.currentData()
+                member_id = self.member_dropdown.selected_member_id()
                 if not member_id:
                     QMessageBox.warning(self, "Missing Data", "Please select a member first.")
                     return
@@ -1,18 +1,35 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QDialog,
+    QTableView, QHeaderView, QMessageBox, QDialog,
     QFormLayout, QLineEdit, QComboBox, QListWidget, QListWidgetItem, QAbstractItemView,
     QCheckBox, QLabel  # Added QCheckBox, QLabel
 )
 from PySide6.QtCore import Qt, QDate
 
 import app_state
-from models.member_model import get_all_members
 from models.tithe_model import get_tithes_by_member, add_tithe_payment
 from gui.receipt_dialog import ReceiptDialog
+from gui.background_task import run_latest
+from gui.member_picker import MemberPicker
+from models.paid_months_model import get_member_paid_months, paid_month_names
+from database.db_connection import PAGE_SIZE
+from gui.record_table_model import RecordTableModel, Column, format_amount, format_month_name
 from datetime import datetime
 
 
+def tithe_payer_name(t):
+    """Show Member Name OR Non-Member Donor Name for a tithe row."""
+    first = t.get('first_name')
+    last = t.get('last_name')
+    donor = t.get('donor_name')
+
+    if first or last:
+        return f"{first or ''} {last or ''}".strip()
+    elif donor:
+        return f"{donor} (Non-Member)"
+    return "Unknown"
+
+
 class TitheWindow(QMainWindow):
     def __init__(self, member=None):
         super().__init__()
@@ -31,11 +48,16 @@ class TitheWindow(QMainWindow):
         layout = QVBoxLayout()
 
         # Table of all tithes for this member
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "Tithe ID", "Transaction ID", "Member/Donor", "Month", "Year", "Amount"
+        self.table_model = RecordTableModel([
+            Column("Tithe ID", "tithe_id"),
+            Column("Transaction ID", "transaction_id", lambda v: "N/A" if v is None else str(v)),
+            Column("Member/Donor", tithe_payer_name),
+            Column("Month", "tithe_month", format_month_name),
+            Column("Year", "tithe_year"),
+            Column("Amount", "amount", lambda v: format_amount(v, prefix="Rs. ")),
         ])
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.table)
 
@@ -50,54 +72,40 @@ class TitheWindow(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # Background query currently feeding the table (cancelled when superseded)
+        self._load_task = None
+
         self.load_tithes()
 
     def load_tithes(self):
-        """Load all tithes from DB."""
+        """Load all tithes from DB (off the GUI thread)."""
         if self.all_members_mode:
-            from models.tithe_model import get_all_tithes
-            tithes = get_all_tithes()
+            # Newest page first; older pages load as the table is scrolled
+            from models.tithe_model import get_tithes_page
+            query, args, on_result = get_tithes_page, (), self.populate_first_page
         else:
             from models.tithe_model import get_tithes_by_member
-            tithes = get_tithes_by_member(self.member["member_id"])
-
-        self.table.setRowCount(0)
-
-        for t in tithes:
-            # Extract month name safely
-            if t.get("tithe_month"):
-                try:
-                    if isinstance(t["tithe_month"], str):
-                        month_name = datetime.strptime(t["tithe_month"], "%Y-%m-%d").strftime("%B")
-                    else:
-                        month_name = t["tithe_month"].strftime("%B")
-                except Exception:
-                    month_name = str(t["tithe_month"])
-            else:
-                month_name = "-"
-
-            transaction_id = str(t.get("transaction_id", "N/A"))
-
-            # Logic to show Member Name OR Non-Member Donor Name
-            first = t.get('first_name')
-            last = t.get('last_name')
-            donor = t.get('donor_name')
-
-            if first or last:
-                member_name = f"{first or ''} {last or ''}".strip()
-            elif donor:
-                member_name = f"{donor} (Non-Member)"
-            else:
-                member_name = "Unknown"
-
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(str(t.get("tithe_id", "-"))))
-            self.table.setItem(row, 1, QTableWidgetItem(transaction_id))
-            self.table.setItem(row, 2, QTableWidgetItem(member_name))
-            self.table.setItem(row, 3, QTableWidgetItem(month_name))
-            self.table.setItem(row, 4, QTableWidgetItem(str(t.get("tithe_year", "-"))))
-            self.table.setItem(row, 5, QTableWidgetItem(f"Rs. {t.get('amount', 0):.2f}"))
+            query, args, on_result = get_tithes_by_member, (self.member["member_id"],), self.populate_table
+
+        self.statusBar().showMessage("Loading tithes...")
+        run_latest(self, "_load_task", query, *args, on_result=on_result, on_error=self._on_load_error)
+
+    def _on_load_error(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Database Error", f"Could not load tithes:\n{error}")
+
+    def populate_table(self, tithes):
+        self.statusBar().clearMessage()
+        self.table_model.set_rows(tithes)
+
+    def populate_first_page(self, tithes):
+        from models.tithe_model import get_tithes_page
+        self.statusBar().clearMessage()
+        self.table_model.set_rows(
+            tithes,
+            page_loader=lambda last: get_tithes_page(last["tithe_id"]),
+            page_size=PAGE_SIZE
+        )
 
     def open_add_tithe_dialog(self):
         dialog = AddTitheDialog(self.member)
@@ -109,6 +117,7 @@ class AddTitheDialog(QDialog):
     def __init__(self, member):
         super().__init__()
         self.member = member
+        self._paid_masks = {}  # member_id -> paid-month bitmaps, fetched once per member
         self.setWindowTitle("Add Tithe")
         self.setFixedSize(400, 600)
 
@@ -123,15 +132,8 @@ class AddTitheDialog(QDialog):
 
         # --- Member Dropdown ---
         self.member_label = QLabel("Select Member:")
-        self.member_dropdown = QComboBox()
-
         if not member.get("member_id"):
-            from models.member_model import get_all_members
-            members = get_all_members()
-            for m in members:
-                full_name = f"{m['first_name']} {m['last_name']}"
-                self.member_dropdown.addItem(full_name, m["member_id"])
-
+            self.member_dropdown = MemberPicker()
             self.member_dropdown.currentIndexChanged.connect(self.refresh_months_list)
             layout.addRow(self.member_label, self.member_dropdown)
 
@@ -199,7 +201,7 @@ class AddTitheDialog(QDialog):
         if self.member.get("member_id"):
             return self.member["member_id"]
         elif hasattr(self, 'member_dropdown') and not self.non_member_cb.isChecked():
-            return self.member_dropdown.currentData()
+            return self.member_dropdown.selected_member_id()
         return None
 
     def refresh_months_list(self):
@@ -218,7 +220,6 @@ class AddTitheDialog(QDialog):
             return
 
         # Existing Logic for Members (Check paid history)
-        from models.tithe_model import get_tithes_by_member
         member_id = self.get_selected_member_id()
 
         if not member_id:
@@ -227,16 +228,9 @@ class AddTitheDialog(QDialog):
             return
 
         year = int(self.year_select.currentText())
-        existing_tithes = get_tithes_by_member(member_id)
-        paid_months = []
-
-        for t in existing_tithes:
-            try:
-                if t["tithe_year"] == year:
-                    month_name = datetime.strptime(str(t["tithe_month"]), "%Y-%m-%d").strftime("%B")
-                    paid_months.append(month_name)
-            except Exception:
-                continue
+        if member_id not in self._paid_masks:
+            self._paid_masks[member_id] = get_member_paid_months(member_id)
+        paid_months = paid_month_names(self._paid_masks[member_id], "tithe", year)
 
         unpaid_months = [m for m in all_months if m not in paid_months]
 
@@ -1,9 +1,13 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QComboBox, QHeaderView, QLineEdit, QMessageBox, QFileDialog
+    QTableView, QComboBox, QHeaderView, QLineEdit, QMessageBox, QFileDialog
 )
 from PySide6.QtCore import Qt
-from models.transaction_model import get_filtered_transactions, get_transaction_summary
+from database.db_connection import PAGE_SIZE
+from models.transaction_model import get_filtered_transactions, get_transactions_page
+from models.ledger_rollup_model import get_ledger_totals
+from gui.background_task import run_in_background, run_latest
+from gui.record_table_model import RecordTableModel, Column, format_amount, format_date
 from datetime import datetime
 import pandas as pd  # 🟩 NEW
 
@@ -90,11 +94,18 @@ class TransactionViewWindow(QMainWindow):
         # -------------------------
         # Table Section
         # -------------------------
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Transaction ID", "Date", "Type", "Member", "Amount", "User", "Comments"
+        self.table_model = RecordTableModel([
+            Column("Transaction ID", "transaction_id"),
+            Column("Date", "transaction_date", format_date),
+            Column("Type", "transaction_type"),
+            Column("Member", "member_name"),
+            Column("Amount", "amount", format_amount,
+                   foreground=lambda t: Qt.red if (t["amount"] or 0) < 0 else Qt.darkGreen),
+            Column("User", "user_name"),
+            Column("Comments", "comments", lambda v: v or ""),
         ])
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         main_layout.addWidget(self.table)
 
@@ -110,6 +121,11 @@ class TransactionViewWindow(QMainWindow):
         summary_layout.addWidget(self.net_balance_label)
         main_layout.addLayout(summary_layout)
 
+        # Per-type subtotals for the current filter
+        self.breakdown_label = QLabel("")
+        self.breakdown_label.setWordWrap(True)
+        main_layout.addWidget(self.breakdown_label)
+
         # -------------------------
         # Container Setup
         # -------------------------
@@ -117,8 +133,9 @@ class TransactionViewWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # Track last loaded transactions
-        self.current_transactions = []
+        self._load_task = None
+        self._totals_task = None
+        self._export_task = None
 
         # Initial Load
         self.load_transactions()
@@ -126,22 +143,56 @@ class TransactionViewWindow(QMainWindow):
     # -------------------------------------------------
     # 🔄 Load and Display Transactions
     # -------------------------------------------------
-    def load_transactions(self):
-        year = self.year_filter.currentText()
-        month = self.month_filter.currentText()
-        tr_type = self.type_filter.currentText()
-        exp_type = self.expense_filter.currentText()
+    def _filters(self):
+        return (self.year_filter.currentText(), self.month_filter.currentText(),
+                self.type_filter.currentText(), self.expense_filter.currentText())
+
+    def _load_pages(self, id_contains=None):
+        """Newest page first; older pages load as the table is scrolled."""
+        filters = self._filters()
+
+        def show_first_page(rows):
+            self.statusBar().clearMessage()
+            if id_contains and not rows:
+                QMessageBox.information(self, "No Results", f"No transaction found with ID: {id_contains}")
+                return
+            self.table_model.set_rows(
+                rows, page_loader=lambda last: get_transactions_page(*filters, after=last, id_contains=id_contains),
+                page_size=PAGE_SIZE)
+
+        self.statusBar().showMessage("Loading transactions...")
+        run_latest(self, "_load_task", get_transactions_page, *filters, id_contains=id_contains,
+                   on_result=show_first_page, on_error=self._on_load_error)
 
-        transactions = get_filtered_transactions(year, month, tr_type, exp_type)
-        summary = get_transaction_summary(transactions)
+    def load_transactions(self):
+        year, month, tr_type, exp_type = self._filters()
+        self._load_pages()
+
+        # Totals come from the monthly ledger rollup, independently of the row list
+        run_latest(
+            self, "_totals_task", get_ledger_totals, year, month, tr_type, exp_type,
+            on_result=self.show_totals,
+            on_error=lambda e: print(f"Could not load transaction totals: {e}")
+        )
 
-        self.current_transactions = transactions  # 🟩 store current data
-        self.populate_table(transactions)
+    def _on_load_error(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Database Error", f"Could not load transactions:\n{error}")
 
+    def show_totals(self, totals):
         # Update Summary
-        self.total_income_label.setText(f"Total Income: Rs. {summary['income']:.2f}")
-        self.total_expense_label.setText(f"Total Expense: Rs. {summary['expense']:.2f}")
-        self.net_balance_label.setText(f"Net Balance: Rs. {summary['net']:.2f}")
+        self.total_income_label.setText(f"Total Income: Rs. {totals['income']:.2f}")
+        self.total_expense_label.setText(f"Total Expense: Rs. {totals['expense']:.2f}")
+        self.net_balance_label.setText(f"Net Balance: Rs. {totals['net']:.2f}")
+
+        self.breakdown_label.setText("   |   ".join(
+            f"{str(t['transaction_type'] or '-').replace('_', ' ').capitalize()}: Rs. {t['net']:.2f}"
+            for t in totals["by_type"]
+        ))
+        self.breakdown_label.setToolTip("\n".join(
+            f"{m['month'] or '-'}: income Rs. {m['income']:.2f}, expense Rs. {m['expense']:.2f}, net Rs. {m['net']:.2f}"
+            for m in totals["by_month"]
+        ))
 
     # -------------------------------------------------
     # 🔍 Search by Transaction ID
@@ -152,42 +203,14 @@ class TransactionViewWindow(QMainWindow):
             QMessageBox.warning(self, "Input Required", "Please enter a Transaction ID to search.")
             return
 
-        results = [t for t in self.current_transactions if search_id.lower() in str(t["transaction_id"]).lower()]
-
-        if not results:
-            QMessageBox.information(self, "No Results", f"No transaction found with ID: {search_id}")
-            return
-
-        self.populate_table(results)
-
-    # -------------------------------------------------
-    # 📋 Populate Table Helper
-    # -------------------------------------------------
-    def populate_table(self, transactions):
-        self.table.setRowCount(0)
-        for t in transactions:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(str(t["transaction_id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(str(t["transaction_date"])))
-            self.table.setItem(row, 2, QTableWidgetItem(t["transaction_type"]))
-            self.table.setItem(row, 3, QTableWidgetItem(t.get("member_name", "-")))
-
-            amount_item = QTableWidgetItem(f"{t['amount']:.2f}")
-            if t["amount"] < 0:
-                amount_item.setForeground(Qt.red)
-            else:
-                amount_item.setForeground(Qt.darkGreen)
-            self.table.setItem(row, 4, amount_item)
-
-            self.table.setItem(row, 5, QTableWidgetItem(t.get("user_name", "-")))
-            self.table.setItem(row, 6, QTableWidgetItem(t.get("comments", "")))
+        # Searched on the server within the current filters, not just the pages loaded so far
+        self._load_pages(id_contains=search_id)
 
     # -------------------------------------------------
     # 🟩 Export to Excel
     # -------------------------------------------------
     def export_to_excel(self):
-        if not self.current_transactions:
+        if not self.table_model.rowCount():
             QMessageBox.warning(self, "No Data", "No transactions available to export.")
             return
 
@@ -199,8 +222,26 @@ class TransactionViewWindow(QMainWindow):
         if not file_path:
             return
 
+        # The grid only holds the pages scrolled so far: export every matching row
+        self.export_btn.setEnabled(False)
+        self.statusBar().showMessage("Exporting transactions...")
+        self._export_task = run_in_background(
+            get_filtered_transactions, *self._filters(),
+            on_result=lambda rows: self._write_excel(rows, file_path),
+            on_error=self._on_export_error
+        )
+
+    def _on_export_error(self, error):
+        self.export_btn.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Export Failed", f"Could not load transactions:\n{error}")
+
+    def _write_excel(self, transactions, file_path):
+        self.export_btn.setEnabled(True)
+        self.statusBar().clearMessage()
+
         # Convert data to DataFrame
-        df = pd.DataFrame(self.current_transactions)
+        df = pd.DataFrame(transactions)
 
         # Export to Excel
         try:
@@ -1,8 +1,10 @@
 import sys
 from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtCore import Qt
 
 # Import your application's windows
 from gui.login_window import LoginWindow
+from database.schema_migrations import run_migrations
 
 # We no longer need to import get_connection or ConnectionError here,
 # as the models will handle the connection attempts and fallbacks.
@@ -13,6 +15,27 @@ if __name__ == "__main__":
     # This must be the very first step before any Qt widgets are used.
     app = QApplication(sys.argv)
 
+    # --- STEP 1b: APPLY PENDING SCHEMA MIGRATIONS ---
+    # Done before any window queries the database, so no query runs against a
+    # half-migrated schema. Offline this returns after the connect timeout; if
+    # another client holds the migration lock it waits up to its GET_LOCK timeout.
+    app.setOverrideCursor(Qt.WaitCursor)
+    try:
+        applied, failures = run_migrations()
+    finally:
+        app.restoreOverrideCursor()
+
+    if failures:
+        details = "\n\n".join(
+            f"{name}: {error}" if version is None else f"{version:04d}_{name}: {error}"
+            for version, name, error in failures
+        )
+        QMessageBox.warning(
+            None,
+            "Database Update Incomplete",
+            f"Some database updates could not be applied and will be retried at the next start:\n\n{details}"
+        )
+
     # --- STEP 2: START APPLICATION (Launch Login Window Directly) ---
     # The application now starts without performing an initial database diagnostic.
     # The first connection attempt will happen inside LoginWindow.handle_login(),
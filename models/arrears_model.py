@@ -0,0 +1,140 @@
+"""
+Membership arrears: which months each active member still owes for a year.
+
+One grouped query returns every active member with a 12-bit mask of the months
+paid that year (BIT_OR over `membership`). The months owed are then the due
+months minus that mask, so the whole dues list costs a single round trip.
+Offline, the same masks come from the paid-month bitmaps in the local cache.
+"""
+from datetime import date, datetime
+
+import pymysql.cursors
+
+from database.db_connection import get_connection, ConnectionError, MONTH_NAMES
+from database.local_store import get_local_connection
+from models.paid_months_model import mask_to_month_names, months_to_mask
+
+ARREARS_QUERY = """
+    SELECT m.member_id, m.first_name, m.last_name, m.membership_card_no, m.phone, m.join_date,
+           COALESCE(p.mask, 0) AS mask
+    FROM members m
+    LEFT JOIN (
+        SELECT member_id, BIT_OR(1 << (MONTH(payment_month) - 1)) AS mask
+        FROM membership
+        WHERE payment_year = %s AND payment_month IS NOT NULL
+        GROUP BY member_id
+    ) p ON p.member_id = m.member_id
+    WHERE LOWER(m.status) = 'active'
+    ORDER BY m.member_id
+"""
+
+LOCAL_ARREARS_QUERY = """
+    SELECT m.member_id, m.first_name, m.last_name, m.membership_card_no, m.phone, m.join_date,
+           COALESCE(p.mask, 0) AS mask
+    FROM local_members m
+    LEFT JOIN local_paid_months p
+           ON p.member_id = m.member_id AND p.payment_type = 'membership' AND p.year = ?
+    WHERE LOWER(COALESCE(m.status, 'active')) = 'active'
+    ORDER BY m.member_id
+"""
+
+
+def default_through_month(year, today=None):
+    """Last month that is due: the current month this year, December for past years, none for future ones."""
+    today = today or date.today()
+    year = int(year)
+    if year < today.year:
+        return 12
+    if year > today.year:
+        return 0
+    return today.month
+
+
+def _join_month(join_date, year):
+    """First month due in `year` for a member who joined on `join_date` (13 = joined after it)."""
+    if not join_date:
+        return 1
+    if isinstance(join_date, str):
+        try:
+            join_date = datetime.strptime(join_date[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return 1
+    if join_date.year < year:
+        return 1
+    if join_date.year > year:
+        return 13
+    return join_date.month
+
+
+def _fetch_member_masks(year):
+    """[(member row, paid mask)] for every active member; online, else from the local cache."""
+    try:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(ARREARS_QUERY, (year,))
+            return cursor.fetchall(), True
+        finally:
+            conn.close()
+    except ConnectionError:
+        pass
+
+    local_conn = get_local_connection()
+    try:
+        rows = [dict(row) for row in local_conn.execute(LOCAL_ARREARS_QUERY, (year,))]
+
+        # Payments taken offline and not uploaded yet count as paid
+        pending = {}
+        for row in local_conn.execute("SELECT member_id, months FROM offline_membership WHERE year = ?", (year,)):
+            pending[row["member_id"]] = pending.get(row["member_id"], 0) | months_to_mask(
+                (row["months"] or "").split(","))
+        for row in rows:
+            row["mask"] |= pending.get(row["member_id"], 0)
+        return rows, False
+    finally:
+        local_conn.close()
+
+
+def get_membership_arrears(year, through_month=None, include_paid_up=False):
+    """
+    Months of membership fee owed in `year` (January..through_month, and not
+    before the member joined) by every active member.
+
+    Returns (rows, online). Each row: member_id, name, membership_card_no, phone,
+    months_due (count), due_months (names, comma-separated), paid_count.
+    Members who owe nothing are left out unless include_paid_up is True.
+    """
+    year = int(year)
+    if through_month is None:
+        through_month = default_through_month(year)
+    through_mask = (1 << through_month) - 1
+
+    members, online = _fetch_member_masks(year)
+
+    arrears = []
+    for member in members:
+        start = _join_month(member.get("join_date"), year)
+        due_mask = through_mask & ~((1 << (start - 1)) - 1)
+        owed_mask = due_mask & ~int(member["mask"])
+        months_due = owed_mask.bit_count()
+        if not months_due and not include_paid_up:
+            continue
+
+        arrears.append({
+            "member_id": member["member_id"],
+            "name": f"{member.get('first_name') or ''} {member.get('last_name') or ''}".strip(),
+            "membership_card_no": member.get("membership_card_no"),
+            "phone": member.get("phone"),
+            "paid_count": (int(member["mask"]) & due_mask).bit_count(),
+            "months_due": months_due,
+            "due_months": ", ".join(name[:3] for name in mask_to_month_names(owed_mask)),
+        })
+
+    arrears.sort(key=lambda r: (-r["months_due"], r["name"].lower()))
+    return arrears, online
+
+
+def arrears_period_label(year, through_month):
+    if not through_month:
+        return f"{year}: nothing due yet"
+    return f"January - {MONTH_NAMES[through_month - 1]} {year}"
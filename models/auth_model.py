@@ -4,7 +4,11 @@ from PySide6.QtWidgets import QMessageBox
 
 # --- CRITICAL OFFLINE IMPORTS ---
 # Import ConnectionError and local connection functions from the dedicated file
-from database.db_connection import get_connection, ConnectionError, get_local_connection
+from database.db_connection import get_connection, ConnectionError
+from database.local_store import get_local_connection, get_sync_watermark, set_sync_watermark, run_write
+from database.member_index import upsert_local_members, replace_local_members
+from models.member_model import invalidate_member_caches
+from models.paid_months_model import sync_paid_months
 # ---------------------------------
 
 
@@ -100,17 +104,11 @@ def sync_local_users():
         users = remote_cursor.fetchall()
         remote_conn.close()
 
-        # 2. Insert/Update Local SQLite Cache
-        local_conn = get_local_connection()
-        local_cursor = local_conn.cursor()
-
-        local_cursor.executemany("""
+        # 2. Insert/Update Local SQLite Cache (on the cache's writer thread)
+        run_write(lambda local_conn: local_conn.executemany("""
             REPLACE INTO local_users (user_id, username, password_hash, full_name, role)
             VALUES (?, ?, ?, ?, ?)
-        """, [(u['user_id'], u['username'], u['password_hash'], u['full_name'], u['role']) for u in users])
-
-        local_conn.commit()
-        local_conn.close()
+        """, [(u['user_id'], u['username'], u['password_hash'], u['full_name'], u['role']) for u in users]))
 
     except ConnectionError:
         # If the sync fails, we silently skip user cache update.
@@ -121,31 +119,65 @@ def sync_local_users():
                             f"Could not sync user cache. Error: {e}")
 
 
-def sync_local_members():
-    """Pulls basic member data from MySQL and caches them locally for offline member lookup."""
+def _member_watermark():
+    """(updated_at, member_id) of the last member synced, or None. Older caches stored only the timestamp."""
+    value = get_sync_watermark('local_members')
+    if not value:
+        return None
+    updated_at, _, member_id = value.partition("|")
+    return updated_at, int(member_id or 0)
+
+
+def sync_local_members(full=False):
+    """
+    Pulls member data from MySQL and caches it locally for offline lookup and the
+    local member search index.
+    Only members changed since the last sync are transferred: rows strictly after
+    the (updated_at, member_id) of the last one seen. With `full` the cache is
+    replaced outright, dropping members deleted on the server.
+    """
     try:
-        # 1. Fetch from MySQL
+        since = None if full else _member_watermark()
+
+        # 1. Fetch changed rows from MySQL
         remote_conn = get_connection()
         remote_cursor = remote_conn.cursor(pymysql.cursors.DictCursor)
 
-        remote_cursor.execute("""
-            SELECT member_id, membership_card_no, first_name, last_name 
-            FROM members 
-        """)
+        if since:
+            # The leading `updated_at >= %s` keeps this a range scan on idx_members_updated_at
+            remote_cursor.execute("""
+                SELECT member_id, membership_card_no, first_name, last_name, email, phone,
+                       nic_no, date_of_birth, join_date, status, updated_at
+                FROM members
+                WHERE updated_at >= %s AND (updated_at > %s OR member_id > %s)
+                ORDER BY updated_at, member_id
+            """, (since[0], since[0], since[1]))
+        else:
+            remote_cursor.execute("""
+                SELECT member_id, membership_card_no, first_name, last_name, email, phone,
+                       nic_no, date_of_birth, join_date, status, updated_at
+                FROM members
+                ORDER BY updated_at, member_id
+            """)
         members = remote_cursor.fetchall()
         remote_conn.close()
 
-        # 2. Insert/Update Local SQLite Cache
-        local_conn = get_local_connection()
-        local_cursor = local_conn.cursor()
+        if not members and since:
+            return
 
-        local_cursor.executemany("""
-            REPLACE INTO local_members (member_id, membership_card_no, first_name, last_name)
-            VALUES (?, ?, ?, ?)
-        """, [(m['member_id'], m['membership_card_no'], m['first_name'], m['last_name']) for m in members])
+        # 2. Insert/Update Local SQLite Cache together with the new high-water mark
+        last = members[-1] if members else None
 
-        local_conn.commit()
-        local_conn.close()
+        def store(local_conn):
+            if since:
+                upsert_local_members(local_conn, members)
+            else:
+                replace_local_members(local_conn, members)
+            if last and last['updated_at']:
+                set_sync_watermark('local_members', f"{last['updated_at']}|{last['member_id']}", conn=local_conn)
+
+        run_write(store)
+        invalidate_member_caches()
 
     except ConnectionError:
         # If the sync fails, we silently skip member cache update.
@@ -155,35 +187,47 @@ def sync_local_members():
         QMessageBox.warning(None, "Synchronization Error",
                             f"Could not sync member cache. Error: {e}")
 
-def sync_local_payments():
-    """Pulls ALL payment records from MySQL and caches them locally."""
+def sync_local_payments(full=False):
+    """
+    Pulls membership payment records from MySQL and caches them locally.
+    Uses `membership_id` as a cursor so only rows added since the last sync are
+    transferred. Pass `full=True` to rebuild the cache from scratch (e.g. after
+    payments were deleted on the server).
+    """
     try:
-        # 1. Fetch from MySQL
+        last_id = None if full else get_sync_watermark('local_membership')
+
+        # 1. Fetch new rows from MySQL
         remote_conn = get_connection()
         remote_cursor = remote_conn.cursor(pymysql.cursors.DictCursor)
 
         # Select member_id, the year, and the numeric month (1-12)
         remote_cursor.execute("""
-            SELECT member_id, payment_year, MONTH(payment_month) AS payment_month_num
-            FROM membership 
-        """)
+            SELECT membership_id, member_id, payment_year, MONTH(payment_month) AS payment_month_num
+            FROM membership
+            WHERE membership_id > %s
+            ORDER BY membership_id
+        """, (int(last_id or 0),))
         payments = remote_cursor.fetchall()
         remote_conn.close()
 
+        if not payments and not full:
+            return
+
         # 2. Insert/Update Local SQLite Cache
-        local_conn = get_local_connection()
-        local_cursor = local_conn.cursor()
+        def store(local_conn):
+            if full:
+                local_conn.execute("DELETE FROM local_membership")
 
-        # Clear existing payment data to ensure fresh sync (optional, but safer)
-        local_cursor.execute("DELETE FROM local_membership")
+            local_conn.executemany("""
+                REPLACE INTO local_membership (member_id, payment_year, payment_month_num)
+                VALUES (?, ?, ?)
+            """, [(p['member_id'], p['payment_year'], p['payment_month_num']) for p in payments])
 
-        local_cursor.executemany("""
-            REPLACE INTO local_membership (member_id, payment_year, payment_month_num)
-            VALUES (?, ?, ?)
-        """, [(p['member_id'], p['payment_year'], p['payment_month_num']) for p in payments])
+            set_sync_watermark('local_membership', payments[-1]['membership_id'] if payments else None,
+                               conn=local_conn)
 
-        local_conn.commit()
-        local_conn.close()
+        run_write(store)
 
     except ConnectionError:
         # If the sync fails, we silently skip payment cache update.
@@ -199,6 +243,7 @@ def sync_all_data():
     sync_local_users()
     sync_local_members()
     sync_local_payments() # <-- CRITICAL: Include payment sync here
+    sync_paid_months()
 
 
 # ----------------------------------------------------
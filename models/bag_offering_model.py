@@ -1,5 +1,6 @@
 from database.db_connection import get_connection
 from models.transaction_model import create_transaction
+from utils.helpers import add_date_filter
 
 
 def add_bag_offering(member_id, service_date, prayer_type, amount, comment):
@@ -38,13 +39,12 @@ def get_bag_offerings(year="All", month="All"):
         WHERE 1=1
     """
     params = []
+    date_clauses = []
 
-    if year != "All":
-        query += " AND YEAR(b.service_date) = %s"
-        params.append(year)
-    if month != "All":
-        query += " AND MONTHNAME(b.service_date) = %s"
-        params.append(month)
+    # Half-open range on the bare column (index-friendly) instead of YEAR()/MONTHNAME()
+    add_date_filter("b.service_date", year, month, date_clauses, params)
+    for clause in date_clauses:
+        query += f" AND {clause}"
 
     query += " ORDER BY b.service_date DESC"
     cursor.execute(query, params)
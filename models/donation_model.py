@@ -1,7 +1,10 @@
-from database.db_connection import get_connection
+from database.db_connection import get_connection, PAGE_SIZE
 from models.transaction_model import create_transaction
 from datetime import date
 
+# Paging key for donations whose transaction row is missing (LEFT JOIN gives NULL)
+NO_DATE = date(1970, 1, 1)
+
 def get_donations_by_member(member_id):
     conn = get_connection()
     cursor = conn.cursor()
@@ -81,4 +84,52 @@ def get_all_donations():
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
-    return rows
\ No newline at end of file
+    return rows
+
+def get_donations_page(after=None, limit=PAGE_SIZE):
+    """
+    Fetch one page of donations in get_all_donations() order, keyset-paginated on
+    (transaction_date, donation_id). `after` is the last row of the previous page.
+    Donations without a transaction have no date; they key as NO_DATE and come last,
+    as NULLs do in get_all_donations().
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query = """
+        SELECT 
+            d.donation_id,
+            d.transaction_id,
+            d.member_id,
+            d.donor_name,
+            d.donor_phone,
+            d.donation_type,
+            d.comment,
+            d.donation_date,
+            tr.amount,
+            tr.transaction_date,
+            m.first_name,
+            m.last_name,
+            m.phone
+        FROM donations d
+        LEFT JOIN transactions tr ON d.transaction_id = tr.transaction_id
+        LEFT JOIN members m ON d.member_id = m.member_id
+    """
+    params = []
+    if after:
+        query += """
+        WHERE COALESCE(tr.transaction_date, %s) < %s
+           OR (COALESCE(tr.transaction_date, %s) = %s AND d.donation_id < %s)
+        """
+        after_date = after['transaction_date'] or NO_DATE
+        params += [NO_DATE, after_date, NO_DATE, after_date, after['donation_id']]
+
+    query += " ORDER BY COALESCE(tr.transaction_date, %s) DESC, d.donation_id DESC LIMIT %s"
+    params.append(NO_DATE)
+    params.append(limit)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
@@ -2,6 +2,7 @@ import uuid
 from datetime import date
 from database.db_connection import get_connection
 import app_state
+from models.ledger_rollup_model import add_to_rollup
 
 def add_expense(expense_type, amount, receipt_number, comments):
     try:
@@ -24,6 +25,7 @@ def add_expense(expense_type, amount, receipt_number, comments):
             INSERT INTO expenses (transaction_id, expense_type, receipt_number, comments)
             VALUES (%s, %s, %s, %s)
         """, (transaction_id, expense_type, receipt_number, comments))
+        add_to_rollup(cursor, [(date.today(), "expense", amt, expense_type)])
 
         conn.commit()
         conn.close()
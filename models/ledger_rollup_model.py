@@ -0,0 +1,246 @@
+"""
+Monthly ledger rollups: income / expense / count per (year, month, transaction
+type, expense type) in `ledger_monthly_rollup` (migration 0006).
+
+Every model that writes to `transactions` calls add_to_rollup() with the same
+cursor before it commits, so the rollup changes in the same MySQL transaction as
+the ledger. Reports then read at most 12 x types rows per year, however many
+transactions there are. rebuild_ledger_rollup() recomputes it from scratch
+(after manual edits to the ledger, or if it ever drifts).
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import pymysql.err
+
+from database.db_connection import get_connection
+from utils.helpers import MONTH_NAMES
+
+ROLLUP_TABLE = "ledger_monthly_rollup"
+NO_SUCH_TABLE = 1146  # Migration 0006 not applied yet
+CENT = Decimal("0.01")
+
+
+# -----------------------------------------------------
+# ✏️ INCREMENTAL UPDATES (called by the write paths)
+# -----------------------------------------------------
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def add_to_rollup(cursor, entries):
+    """
+    Add ledger rows to the rollup, inside the caller's transaction (call before commit).
+    entries: iterable of (transaction_date, transaction_type, amount[, expense_type]).
+    One multi-row upsert per call.
+    """
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+    for entry in entries:
+        transaction_date, transaction_type, amount = entry[:3]
+        expense_type = entry[3] if len(entry) > 3 else None
+        day = _as_date(transaction_date)
+        # Rounded as the ledger's 2-decimal amount column stores it, so the rollup sums what was saved
+        amount = Decimal(str(amount)).quantize(CENT, ROUND_HALF_UP)
+
+        bucket = totals[(day.year, day.month, transaction_type or "", expense_type or "")]
+        if amount > 0:
+            bucket[0] += amount
+        else:
+            bucket[1] += -amount
+        bucket[2] += 1
+
+    if not totals:
+        return
+
+    try:
+        cursor.executemany(f"""
+            INSERT INTO {ROLLUP_TABLE} (period_year, period_month, transaction_type, expense_type,
+                                        income, expense, txn_count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE income = income + VALUES(income),
+                                    expense = expense + VALUES(expense),
+                                    txn_count = txn_count + VALUES(txn_count)
+        """, [key + tuple(values) for key, values in totals.items()])
+    except pymysql.err.ProgrammingError as e:
+        # No rollup table yet: the ledger write goes ahead; migration 0006 fills it from scratch
+        if e.args[0] != NO_SUCH_TABLE:
+            raise
+        print(f"Ledger rollup not updated (table missing): {e}")
+
+
+def rebuild_ledger_rollup():
+    """Recompute the whole rollup from transactions in one transaction. Returns the number of rows."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        cursor.execute(f"""
+            INSERT INTO {ROLLUP_TABLE} (period_year, period_month, transaction_type, expense_type,
+                                        income, expense, txn_count)
+            SELECT YEAR(t.transaction_date), MONTH(t.transaction_date), COALESCE(t.transaction_type, ''),
+                   COALESCE(e.expense_type, ''),
+                   SUM(CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END),
+                   SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END),
+                   COUNT(*)
+            FROM transactions t
+            LEFT JOIN expenses e ON e.transaction_id = t.transaction_id
+            GROUP BY YEAR(t.transaction_date), MONTH(t.transaction_date), COALESCE(t.transaction_type, ''),
+                     COALESCE(e.expense_type, '')
+        """)
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------
+# 📊 REPORT READS
+# -----------------------------------------------------
+def _rollup_filters(year, month, tr_type, exp_type):
+    """Same selections as transaction_model._transaction_filters, on the rollup's columns."""
+    clauses = []
+    params = []
+    if year != "All":
+        clauses.append("period_year = %s")
+        params.append(int(year))
+    if month != "All":
+        clauses.append("period_month = %s")
+        params.append(MONTH_NAMES.index(month) + 1)
+    if tr_type != "All Types":
+        clauses.append("transaction_type = %s")
+        params.append(tr_type)
+    if tr_type == "expense" and exp_type != "All Expense Types":
+        clauses.append("expense_type = %s")
+        params.append(exp_type)
+    return clauses, params
+
+
+def group_totals(rows, key, label):
+    """Add up grouped income/expense/count rows by `key`, each with its net, sorted by key."""
+    totals = {}
+    for row in rows:
+        entry = totals.setdefault(row[key], {label: row[key], "income": 0, "expense": 0, "count": 0})
+        entry["income"] += row["income"] or 0
+        entry["expense"] += row["expense"] or 0
+        entry["count"] += row["count"]
+    for entry in totals.values():
+        entry["net"] = entry["income"] - entry["expense"]
+    return [totals[k] for k in sorted(totals, key=lambda k: (k is None, k))]
+
+
+def get_rollup_totals(year, month, tr_type, exp_type):
+    """
+    get_transaction_totals() answered from the rollup: the same dict shape
+    (income, expense, net, count, by_type, by_month).
+    """
+    clauses, params = _rollup_filters(year, month, tr_type, exp_type)
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT transaction_type,
+                   CONCAT(period_year, '-', LPAD(period_month, 2, '0')) AS month,
+                   SUM(income) AS income,
+                   SUM(expense) AS expense,
+                   SUM(txn_count) AS count
+            FROM {ROLLUP_TABLE}
+            WHERE 1=1 {"".join(f" AND {clause}" for clause in clauses)}
+            GROUP BY transaction_type, period_year, period_month
+        """, params)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    income = sum(row["income"] or 0 for row in rows)
+    expense = sum(row["expense"] or 0 for row in rows)
+    return {
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "count": sum(int(row["count"] or 0) for row in rows),
+        "by_type": group_totals(rows, "transaction_type", "transaction_type"),
+        "by_month": group_totals(rows, "month", "month"),
+    }
+
+
+def get_ledger_totals(year, month, tr_type, exp_type):
+    """Report totals from the rollup; from the raw ledger while migration 0006 is pending."""
+    try:
+        return get_rollup_totals(year, month, tr_type, exp_type)
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] != NO_SUCH_TABLE:
+            raise
+        from models.transaction_model import get_transaction_totals
+        return get_transaction_totals(year, month, tr_type, exp_type)
+
+
+def get_monthly_finance(year):
+    """
+    Twelve rows for `year` (month 1-12): income, expense, net, count, and the net
+    of each transaction type under "net_<type>". Plus the year's totals.
+    Returns (months, annual).
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT period_month, transaction_type,
+                   SUM(income) AS income, SUM(expense) AS expense, SUM(txn_count) AS count
+            FROM {ROLLUP_TABLE}
+            WHERE period_year = %s
+            GROUP BY period_month, transaction_type
+        """, (int(year),))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    months = [{"month": m, "month_name": MONTH_NAMES[m - 1], "income": Decimal(0), "expense": Decimal(0),
+               "count": 0} for m in range(1, 13)]
+    for row in rows:
+        entry = months[row["period_month"] - 1]
+        entry["income"] += row["income"] or 0
+        entry["expense"] += row["expense"] or 0
+        entry["count"] += int(row["count"] or 0)
+        type_key = f"net_{row['transaction_type']}"
+        entry[type_key] = entry.get(type_key, 0) + (row["income"] or 0) - (row["expense"] or 0)
+    for entry in months:
+        entry["net"] = entry["income"] - entry["expense"]
+
+    annual = {
+        "income": sum(m["income"] for m in months),
+        "expense": sum(m["expense"] for m in months),
+        "count": sum(m["count"] for m in months),
+    }
+    annual["net"] = annual["income"] - annual["expense"]
+    return months, annual
+
+
+def get_annual_finance():
+    """One row per year on record: income, expense, net, count."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT period_year AS year, SUM(income) AS income, SUM(expense) AS expense,
+                   SUM(txn_count) AS count
+            FROM {ROLLUP_TABLE}
+            GROUP BY period_year
+            ORDER BY period_year DESC
+        """)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    for row in rows:
+        row["net"] = (row["income"] or 0) - (row["expense"] or 0)
+    return rows
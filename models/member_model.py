@@ -1,9 +1,48 @@
+import re
+
 import pymysql.cursors
+import pymysql.err
 from PySide6.QtWidgets import QMessageBox
 
 # Assuming these files provide the necessary custom exception and connection logic
-from database.db_connection import get_connection, ConnectionError
-from database.local_db import get_local_connection
+from database.db_connection import get_connection, ConnectionError, PAGE_SIZE
+from database.local_store import get_local_connection, submit_write
+from database.member_index import upsert_local_members, member_matches, member_query_refines
+from utils.cache import LRUCache, SearchResultCache
+
+# Recent member searches (search-as-you-type). Cleared on add_member and member sync.
+member_search_cache = SearchResultCache(member_matches, refines=member_query_refines,
+                                        maxsize=64, ttl=300, trust_empty=False)
+
+# Member rows already fetched this session, keyed ("id", 12) / ("card", "C-104") / ("cnic", "...").
+# Read-through: lookups by ID, card or CNIC ask MySQL only on a miss. Cleared on add_member and member sync.
+MEMBER_CACHE_SIZE = 512
+MEMBER_CACHE_TTL = 300
+member_cache = LRUCache(maxsize=MEMBER_CACHE_SIZE, ttl=MEMBER_CACHE_TTL)
+
+
+def _cached_member(kind, value):
+    """A copy of the cached member row for ("id" | "card" | "cnic", value), or None."""
+    if value in (None, ""):
+        return None
+    member = member_cache.get((kind, str(value)))
+    return dict(member) if member is not None else None
+
+
+def _remember_member(member):
+    """Cache a member row under its ID, card number and CNIC."""
+    if not member:
+        return
+    member = dict(member)
+    for kind, field in (("id", "member_id"), ("card", "membership_card_no"), ("cnic", "nic_no")):
+        if member.get(field) not in (None, ""):
+            member_cache.put((kind, str(member[field])), member)
+
+
+def invalidate_member_caches():
+    """Forget cached member rows and searches (after any write to members)."""
+    member_cache.clear()
+    member_search_cache.invalidate()
 
 
 # ----------------------------------------------------
@@ -59,44 +98,42 @@ def sync_local_members():
 
 
 # ----------------------------------------------------
-# CORE MEMBER CHECK AND ADDITION
+# CORE MEMBER ADDITION
 # ----------------------------------------------------
 
-def member_exists(email, phone, nic_no, membership_card_no):
+# Unique key columns on `members`, with the label reported when a new member collides
+MEMBER_UNIQUE_FIELDS = (
+    ("membership_card_no", "Membership Card"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("nic_no", "NIC"),
+)
+
+
+def _duplicate_member_field(error_message):
     """
-    Checks if a member with the same email, phone, NIC, or membership card
-    already exists. Returns True if found, False otherwise.
+    Which unique field a 1062 error is about, from its key name:
+    "Duplicate entry 'x' for key 'nic_no'" (MariaDB) / "... for key 'members.uq_members_nic_no'" (MySQL 8).
     """
-    conn = None
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-                       SELECT COUNT(*)
-                       FROM members
-                       WHERE email = %s
-                          OR phone = %s
-                          OR nic_no = %s
-                          OR membership_card_no = %s
-                       """, (email, phone, nic_no, membership_card_no))
-        # Ensure we fetch the count correctly from the tuple result
-        (count,) = cursor.fetchone()
-        return count > 0
-    except Exception as e:
-        print(f"Database error during member existence check: {e}")
-        return False
-    finally:
-        if conn:
-            conn.close()
+    match = re.search(r"for key '([^']+)'", error_message or "")
+    key_name = match.group(1).split(".")[-1] if match else ""
+    for column, label in MEMBER_UNIQUE_FIELDS:
+        if column in key_name or (column == "membership_card_no" and "card" in key_name):
+            return label
+    return "Email, Phone, NIC, or Membership Card"
 
 
 def add_member(first_name, last_name, email, phone, dob, join_date, nic_no, membership_card_no, status="active"):
     """
-    Adds a new member to the database if they don't already exist.
+    Adds a new member in a single INSERT. Duplicates are rejected by the unique keys
+    on email, phone, NIC and card (atomic, so two counters cannot register the same
+    person at once) and the message names the field that collided.
     Returns (success_status: bool, message: str).
     """
-    if member_exists(email, phone, nic_no, membership_card_no):
-        return False, "Member with same Email, Phone, NIC, or Membership Card already exists."
+    # Blank optional fields are stored as NULL so they never collide with each other
+    email, phone, nic_no, membership_card_no = (
+        value or None for value in (email, phone, nic_no, membership_card_no)
+    )
 
     conn = None
     try:
@@ -109,7 +146,20 @@ def add_member(first_name, last_name, email, phone, dob, join_date, nic_no, memb
                 """
         cursor.execute(query, (first_name, last_name, email, phone, membership_card_no, nic_no, dob, join_date, status))
         conn.commit()
+        invalidate_member_caches()
+        _cache_new_member({
+            "member_id": cursor.lastrowid, "first_name": first_name, "last_name": last_name,
+            "email": email, "phone": phone, "membership_card_no": membership_card_no, "nic_no": nic_no,
+            "date_of_birth": dob, "join_date": join_date, "status": status,
+        })
         return True, "Member added successfully!"
+    except pymysql.err.IntegrityError as e:
+        if conn:
+            conn.rollback()
+        if e.args[0] == 1062:
+            return False, f"A member with the same {_duplicate_member_field(e.args[1])} already exists."
+        print(f"Database error adding member: {e}")
+        return False, f"Database error: Could not add member. {e}"
     except Exception as e:
         print(f"Database error adding member: {e}")
         if conn:
@@ -120,6 +170,16 @@ def add_member(first_name, last_name, email, phone, dob, join_date, nic_no, memb
             conn.close()
 
 
+def _cache_new_member(member):
+    """Make a just-added member findable by the local search box before the next sync."""
+    def report(future):
+        if future.exception():
+            print(f"Could not cache new member locally: {future.exception()}")
+
+    # Queued on the cache's writer thread; the dialog does not wait for it
+    submit_write(upsert_local_members, [member]).add_done_callback(report)
+
+
 # ----------------------------------------------------
 # FETCHING AND SEARCHING
 # ----------------------------------------------------
@@ -142,6 +202,69 @@ def get_all_members():
             conn.close()
 
 
+def get_member_directory(since=None):
+    """
+    ID, name and card of every member changed since `since` (all members when None),
+    oldest change first: the rows behind the member picker. Offline, the whole
+    local member cache is returned instead (it has no change times).
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        if since is None:
+            cursor.execute("""
+                           SELECT member_id, first_name, last_name, membership_card_no, updated_at
+                           FROM members
+                           ORDER BY updated_at
+                           """)
+        else:
+            cursor.execute("""
+                           SELECT member_id, first_name, last_name, membership_card_no, updated_at
+                           FROM members
+                           WHERE updated_at >= %s
+                           ORDER BY updated_at
+                           """, (since,))
+        return cursor.fetchall()
+    except ConnectionError:
+        local_conn = get_local_connection()
+        try:
+            rows = local_conn.execute("""
+                                      SELECT member_id, first_name, last_name, membership_card_no
+                                      FROM local_members
+                                      """).fetchall()
+            return [dict(row, updated_at=None) for row in rows]
+        finally:
+            local_conn.close()
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_members_page(after_member_id=None, limit=PAGE_SIZE):
+    """
+    Fetch one page of members in the same order as get_all_members().
+    Keyset pagination: pass the last member_id of the previous page to get the next one,
+    so every page costs the same index range scan regardless of table size.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        if after_member_id is None:
+            cursor.execute("SELECT * FROM members ORDER BY member_id DESC LIMIT %s", (limit,))
+        else:
+            cursor.execute("SELECT * FROM members WHERE member_id < %s ORDER BY member_id DESC LIMIT %s",
+                           (after_member_id, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Database error fetching members page: {e}")
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
 def search_member_by_name(name):
     """Return member info if found by name (case-insensitive partial match on full name)."""
     conn = None
@@ -168,25 +291,17 @@ def search_member_by_name(name):
 
 
 def search_member_by_id(member_id):
-    """Find member by member_id."""
-    conn = None
-    try:
-        conn = get_connection()
-        # Use DictCursor
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("SELECT * FROM members WHERE member_id = %s", (member_id,))
-        result = cursor.fetchall()
-        return result
-    except Exception as e:
-        print(f"Database error during ID search: {e}")
-        return []
-    finally:
-        if conn:
-            conn.close()
+    """Find member by member_id (list of 0 or 1 rows, as the other searches)."""
+    member = get_member_by_id(member_id)
+    return [member] if member else []
 
 
 def search_member_by_cnic(cnic):
     """Search member by CNIC number (exact match on cleaned number)."""
+    cached = _cached_member("cnic", cnic)
+    if cached:
+        return [cached]
+
     conn = None
     try:
         conn = get_connection()
@@ -195,6 +310,8 @@ def search_member_by_cnic(cnic):
         # Assuming CNIC is stored in a clean format in DB, we search the cleaned input
         cursor.execute("SELECT * FROM members WHERE nic_no = %s", (cnic,))
         members = cursor.fetchall()
+        for member in members:
+            _remember_member(member)
         return members
     except Exception as e:
         print(f"Database error during CNIC search: {e}")
@@ -204,26 +321,61 @@ def search_member_by_cnic(cnic):
             conn.close()
 
 
-def search_member_by_phone(phone):
+PHONE_SEARCH_MODES = ("auto", "prefix", "suffix", "contains")
+
+
+def search_member_by_phone(phone, mode="auto"):
     """
-    Search member by phone number, ignoring dashes and spaces in both the search
-    term and the database column for robust matching.
+    Search members by phone number, ignoring dashes, spaces and other punctuation.
+
+    Matches against the indexed `phone_digits` / `phone_digits_rev` columns
+    (migration 0003), so prefix and suffix searches are index range scans:
+      prefix   - number starts with the digits typed (e.g. "0300123")
+      suffix   - number ends with the digits typed (e.g. last 4-7 digits)
+      auto     - prefix OR suffix (default; what the counter usually needs)
+      contains - digits anywhere in the number (scans, but on the stored column)
     """
+    if mode not in PHONE_SEARCH_MODES:
+        raise ValueError(f"Unknown phone search mode: {mode}")
+
+    digits = re.sub(r"\D", "", phone or "")
+    if not digits:
+        return []
+
+    # Digits only, so there are no LIKE wildcards to escape
+    prefix = (f"{digits}%",)
+    suffix = (f"{digits[::-1]}%",)
+
+    if mode == "prefix":
+        query, params = "SELECT * FROM members WHERE phone_digits LIKE %s", prefix
+    elif mode == "suffix":
+        query, params = "SELECT * FROM members WHERE phone_digits_rev LIKE %s", suffix
+    elif mode == "contains":
+        query, params = "SELECT * FROM members WHERE phone_digits LIKE %s", (f"%{digits}%",)
+    else:
+        # UNION rather than OR so each branch uses its own index
+        query = """
+                SELECT * FROM members WHERE phone_digits LIKE %s
+                UNION
+                SELECT * FROM members WHERE phone_digits_rev LIKE %s
+                """
+        params = prefix + suffix
+
     conn = None
     try:
-        cleaned_phone = phone.replace('-', '').replace(' ', '')
         conn = get_connection()
-        # Use DictCursor
         cursor = conn.cursor(pymysql.cursors.DictCursor)
-
-        query = """
-                SELECT * \
-                FROM members
-                WHERE REPLACE(REPLACE(phone, '-', ''), ' ', '') LIKE %s \
-                """
-        cursor.execute(query, (f"%{cleaned_phone}%",))
-        members = cursor.fetchall()
-        return members
+        try:
+            cursor.execute(query, params)
+        except pymysql.err.OperationalError as e:
+            if e.args[0] != 1054:  # Unknown column: migration 0003 not applied yet
+                raise
+            cursor.execute("""
+                           SELECT *
+                           FROM members
+                           WHERE REPLACE(REPLACE(phone, '-', ''), ' ', '') LIKE %s
+                           """, (f"%{digits}%",))
+        return cursor.fetchall()
     except Exception as e:
         print(f"Database error during phone search: {e}")
         return []
@@ -232,11 +384,16 @@ def search_member_by_phone(phone):
             conn.close()
 
 
-def search_member_by_card_number(card_number):
+def search_member_by_card_number(card_number, quiet=False):
     """
     Search member by card number, prioritizing the online MySQL database,
     and falling back to the local SQLite cache if offline.
+    quiet=True prints instead of showing message boxes (for background threads).
     """
+    cached = _cached_member("card", card_number)
+    if cached:
+        return cached
+
     conn = None
 
     try:
@@ -247,13 +404,17 @@ def search_member_by_card_number(card_number):
         member = cursor.fetchone()
         conn.close()
 
+        _remember_member(member)
         return member
 
     except ConnectionError:
         # 2. --- FALLBACK OFFLINE (SQLite Cache) ---
 
-        QMessageBox.information(None, "Status Update",
-                                "Primary database offline. Checking local member cache...")
+        if quiet:
+            print("Primary database offline. Checking local member cache...")
+        else:
+            QMessageBox.information(None, "Status Update",
+                                    "Primary database offline. Checking local member cache...")
 
         local_conn = get_local_connection()
         local_cursor = local_conn.cursor()
@@ -280,13 +441,46 @@ def search_member_by_card_number(card_number):
         return None
 
     except Exception as e:
-        QMessageBox.critical(None, "Search Error",
-                             f"Unexpected error during card search: {e}")
+        if quiet:
+            print(f"Unexpected error during card search: {e}")
+        else:
+            QMessageBox.critical(None, "Search Error",
+                                 f"Unexpected error during card search: {e}")
         return None
 
 
+def search_members_on_server(keyword):
+    """
+    Server-side member search, picking the lookup from the keyword's shape:
+    13 digits -> CNIC, 7-12 digits -> phone, under 6 digits -> member ID,
+    anything else -> card number, then name. Always returns a list.
+    Safe to run off the GUI thread.
+    """
+    # Dashes and spaces are formatting in CNICs and phone numbers
+    cleaned_keyword = keyword.replace('-', '').replace(' ', '')
+
+    if cleaned_keyword.isdigit() and len(cleaned_keyword) == 13:
+        members = search_member_by_cnic(cleaned_keyword)
+    elif cleaned_keyword.isdigit() and 7 <= len(cleaned_keyword) <= 12:
+        members = search_member_by_phone(cleaned_keyword)
+    elif cleaned_keyword.isdigit() and len(cleaned_keyword) < 6:
+        members = search_member_by_id(int(cleaned_keyword))
+    else:
+        # Card numbers may include formatting, so use the keyword as typed
+        members = search_member_by_card_number(keyword, quiet=True) or search_member_by_name(keyword)
+
+    # Card search returns a single record rather than a list
+    if isinstance(members, dict):
+        members = [members]
+    return members or []
+
+
 def get_member_by_id(member_id):
     """Fetch a single member by their ID and return as a dictionary (fetchone)."""
+    cached = _cached_member("id", member_id)
+    if cached:
+        return cached
+
     conn = None
     try:
         conn = get_connection()
@@ -294,6 +488,7 @@ def get_member_by_id(member_id):
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         cursor.execute("SELECT * FROM members WHERE member_id = %s", (member_id,))
         member = cursor.fetchone()
+        _remember_member(member)
         return member
     except Exception as e:
         print(f"Database error during single member fetch by ID: {e}")
@@ -4,7 +4,10 @@ from PySide6.QtWidgets import QMessageBox
 
 # Database and connection imports
 from database.db_connection import get_connection, ConnectionError
-from database.local_db import get_local_connection
+from database.local_store import get_local_connection
+from models.ledger_rollup_model import add_to_rollup
+from models.paid_months_model import mark_paid_months
+from sync.sync_manager import save_offline_membership
 import pymysql.cursors
 
 # App state
@@ -49,7 +52,7 @@ def get_paid_months_for_year(member_id, year):
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-                       SELECT MONTH (payment_month)
+                       SELECT MONTH(payment_month) AS month_num
                        FROM membership
                        WHERE member_id = %s
                          AND payment_year = %s
@@ -58,7 +61,7 @@ def get_paid_months_for_year(member_id, year):
         conn.close()
 
         # Returns a list of month numbers (1-12)
-        return [r[0] for r in rows] if rows else []
+        return [r['month_num'] for r in rows] if rows else []
 
     except ConnectionError:
         # 2. --- FALLBACK OFFLINE: Combine Local History + Pending Payments ---
@@ -70,10 +73,10 @@ def get_paid_months_for_year(member_id, year):
         local_cursor = local_conn.cursor()
         paid_month_numbers = set()
 
-        # A. Query local cache (local_membership_history)
+        # A. Query local cache of synced payments (local_membership)
         local_cursor.execute("""
-                             SELECT CAST(STRFTIME('%m', payment_month) AS INT)
-                             FROM local_membership_history
+                             SELECT payment_month_num
+                             FROM local_membership
                              WHERE member_id = ?
                                AND payment_year = ?
                              """, (member_id, year))
@@ -82,7 +85,7 @@ def get_paid_months_for_year(member_id, year):
         for row in local_cursor.fetchall():
             paid_month_numbers.add(row[0])
 
-        # B. Query pending payments (pending_membership_payments)
+        # B. Query payments taken offline and not uploaded yet (offline_membership)
         month_name_to_num = {
             "January": 1, "February": 2, "March": 3, "April": 4, "May": 5, "June": 6,
             "July": 7, "August": 8, "September": 9, "October": 10, "November": 11, "December": 12
@@ -90,7 +93,7 @@ def get_paid_months_for_year(member_id, year):
 
         local_cursor.execute("""
                              SELECT months
-                             FROM pending_membership_payments
+                             FROM offline_membership
                              WHERE member_id = ? AND year = ?
                              """, (member_id, year))
 
@@ -102,7 +105,6 @@ def get_paid_months_for_year(member_id, year):
                 if name in month_name_to_num:
                     paid_month_numbers.add(month_name_to_num[name])
 
-        local_conn.close()
         # Return the final list of month numbers (1-12)
         return list(paid_month_numbers)
 
@@ -127,6 +129,7 @@ def add_membership_payment(member_id, months, year, total_amount):
     user_id = app_state.current_user['user_id']
     # --------------------------------------------------
 
+    conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
@@ -134,28 +137,18 @@ def add_membership_payment(member_id, months, year, total_amount):
         per_month = round(total_amount / len(months), 2)
         transactions = []
 
+        # Collect every month first so each table gets a single multi-row INSERT
+        transaction_rows = []
+        membership_rows = []
+
         for m in months:
             transaction_id = str(uuid.uuid4())
             month_number = datetime.strptime(m, "%B").month
             # payment_date is YYYY-MM-DD format for database insertion
             payment_date = f"{year}-{month_number:02d}-01"
 
-            # 1. Insert into transactions table (Primary Ledger)
-            cursor.execute("""
-                           INSERT INTO transactions (transaction_id, member_id, user_id, transaction_type, amount,
-                                                     transaction_date)
-                           VALUES (%s, %s, %s, %s, %s, %s)
-                           """, (transaction_id, member_id, user_id, "membership", per_month, date.today()))
-
-            # 2. Insert into membership table (Detail Table)
-            cursor.execute("""
-                           INSERT INTO membership (transaction_id, member_id, payment_month, payment_year)
-                           VALUES (%s, %s, %s, %s)
-                           """, (transaction_id, member_id, payment_date, year))
-
-            # 3. Cache history locally after successful sync (Optional but recommended)
-            # You would need a separate function call here to update local_membership_history
-            # or rely on the sync function that runs on app start/regained connection.
+            transaction_rows.append((transaction_id, member_id, user_id, "membership", per_month, date.today()))
+            membership_rows.append((transaction_id, member_id, payment_date, year))
 
             transactions.append({
                 "transaction_id": transaction_id,
@@ -164,8 +157,28 @@ def add_membership_payment(member_id, months, year, total_amount):
                 "amount": per_month
             })
 
+        # 1. Insert into transactions table (Primary Ledger)
+        cursor.executemany("""
+                           INSERT INTO transactions (transaction_id, member_id, user_id, transaction_type, amount,
+                                                     transaction_date)
+                           VALUES (%s, %s, %s, %s, %s, %s)
+                           """, transaction_rows)
+
+        add_to_rollup(cursor, [(row[5], row[3], row[4]) for row in transaction_rows])
+
+        # 2. Insert into membership table (Detail Table)
+        cursor.executemany("""
+                           INSERT INTO membership (transaction_id, member_id, payment_month, payment_year)
+                           VALUES (%s, %s, %s, %s)
+                           """, membership_rows)
+
+        # 3. Cache history locally after successful sync (Optional but recommended)
+        # You would need a separate function call here to update local_membership
+        # or rely on the sync function that runs on app start/regained connection.
+
         conn.commit()
         conn.close()
+        mark_paid_months(member_id, "membership", year, months)
         return True, transactions
 
     except ConnectionError as e:
@@ -175,25 +188,12 @@ def add_membership_payment(member_id, months, year, total_amount):
         QMessageBox.warning(None, "Connection Lost",
                             f"Database unreachable. Saving payment locally (Offline Mode). Error: {e}")
 
-        import sqlite3
-        from database.local_db import get_local_connection, init_local_db
-
-        init_local_db()
-        local_conn = get_local_connection()
-        local_cursor = local_conn.cursor()
-
-        # Generate an offline UUID and prep data
-        offline_id = str(uuid.uuid4())[:8]
-        months_str = ",".join(months)
-        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        local_cursor.execute("""
-                             INSERT INTO pending_membership_payments (member_id, months, year, total_amount, created_at, synced)
-                             VALUES (?, ?, ?, ?, ?, 0)
-                             """, (member_id, months_str, year, total_amount, created_at))
-
-        local_conn.commit()
-        local_conn.close()
+        # Queue it where sync/sync_manager uploads from (same table as the auto-sync)
+        queued_uuid = save_offline_membership(member_id, months, year, total_amount,
+                                              round(total_amount / len(months), 2))
+        if not queued_uuid:
+            return False, "Database unreachable and the payment could not be saved locally."
+        offline_id = queued_uuid[:8]
 
         # Success notification
         QMessageBox.information(None, "Offline Success",
@@ -209,6 +209,10 @@ def add_membership_payment(member_id, months, year, total_amount):
 
     except Exception as e:
         print(f"Transaction Error: {e}")
+        if conn and conn.open:
+            # Keep the multi-month payment all-or-nothing
+            conn.rollback()
+            conn.close()
         return False, f"Unable to add membership record due to internal error: {e}"
 
 # -----------------------------------------------------
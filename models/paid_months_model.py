@@ -0,0 +1,191 @@
+"""
+Paid-month bitmaps: which months of a year a member has already paid, per payment type.
+
+One integer per (member, payment type, year); bit n-1 set means month n is paid.
+They live in the local cache (local_paid_months), are refilled by one grouped query
+on sync, and are OR-ed in after every payment, so month pickers can switch years
+without a query, online or offline.
+"""
+import pymysql.cursors
+
+from database.db_connection import get_connection, ConnectionError, MONTH_NAMES
+from database.local_store import get_local_connection, run_write, submit_write
+
+PAYMENT_TYPES = ("membership", "tithe", "parking")
+ALL_MONTHS_MASK = (1 << 12) - 1
+
+# One row per (member, type, year) with the months OR-ed together. Parking stores the
+# month as its name, the other two as the first day of the month.
+PAID_MONTHS_QUERY = """
+    SELECT member_id, 'membership' AS payment_type, payment_year AS year,
+           BIT_OR(1 << (MONTH(payment_month) - 1)) AS mask
+    FROM membership
+    WHERE member_id IS NOT NULL AND payment_month IS NOT NULL {member_filter}
+    GROUP BY member_id, payment_year
+    UNION ALL
+    SELECT member_id, 'tithe', tithe_year,
+           BIT_OR(1 << (MONTH(tithe_month) - 1))
+    FROM tithe
+    WHERE member_id IS NOT NULL AND tithe_month IS NOT NULL {member_filter}
+    GROUP BY member_id, tithe_year
+    UNION ALL
+    SELECT member_id, 'parking', payment_year,
+           BIT_OR(1 << (FIELD(payment_month, {month_names}) - 1))
+    FROM parking
+    WHERE member_id IS NOT NULL AND FIELD(payment_month, {month_names}) > 0 {member_filter}
+    GROUP BY member_id, payment_year
+"""
+
+
+# -----------------------------------------------------
+# 🔢 BITMAP HELPERS
+# -----------------------------------------------------
+def month_number(month):
+    """1-12 for a month number or name ("March" -> 3); None if it is neither."""
+    if isinstance(month, int):
+        return month if 1 <= month <= 12 else None
+    name = str(month).strip().capitalize()
+    return MONTH_NAMES.index(name) + 1 if name in MONTH_NAMES else None
+
+
+def months_to_mask(months):
+    mask = 0
+    for month in months:
+        number = month_number(month)
+        if number:
+            mask |= 1 << (number - 1)
+    return mask
+
+
+def mask_to_month_names(mask):
+    return [name for i, name in enumerate(MONTH_NAMES) if mask & (1 << i)]
+
+
+def mask_to_month_numbers(mask):
+    return [i + 1 for i in range(12) if mask & (1 << i)]
+
+
+# -----------------------------------------------------
+# 🗄️ LOCAL CACHE (write jobs run on the cache's writer thread)
+# -----------------------------------------------------
+def _replace_masks(conn, rows, member_id=None):
+    """Replace every bitmap (or one member's) with rows from PAID_MONTHS_QUERY."""
+    if member_id is None:
+        conn.execute("DELETE FROM local_paid_months")
+    else:
+        conn.execute("DELETE FROM local_paid_months WHERE member_id = ?", (member_id,))
+    conn.executemany("""
+        INSERT INTO local_paid_months (member_id, payment_type, year, mask)
+        VALUES (?, ?, ?, ?)
+    """, [(r["member_id"], r["payment_type"], int(r["year"]), int(r["mask"])) for r in rows if r["year"]])
+
+
+def _or_mask(conn, member_id, payment_type, year, mask):
+    conn.execute("""
+        INSERT INTO local_paid_months (member_id, payment_type, year, mask)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (member_id, payment_type, year) DO UPDATE SET mask = mask | excluded.mask
+    """, (member_id, payment_type, year, mask))
+
+
+def mark_paid_months(member_id, payment_type, year, months):
+    """Record months just paid (names or numbers). Queued; the caller does not wait."""
+    mask = months_to_mask(months)
+    if not member_id or not mask:
+        return
+
+    def report(future):
+        if future.exception():
+            print(f"Could not update paid months locally: {future.exception()}")
+
+    submit_write(_or_mask, member_id, payment_type, int(year), mask).add_done_callback(report)
+
+
+def _pending_membership_masks(conn, member_id):
+    """{("membership", year): mask} of payments taken offline and not uploaded yet."""
+    masks = {}
+    for row in conn.execute("SELECT year, months FROM offline_membership WHERE member_id = ?", (member_id,)):
+        key = ("membership", int(row["year"]))
+        masks[key] = masks.get(key, 0) | months_to_mask((row["months"] or "").split(","))
+    return masks
+
+
+def _local_masks(member_id, include_cached=True):
+    """{(payment_type, year): mask} from the cache, plus membership payments still queued offline."""
+    conn = get_local_connection()
+    try:
+        masks = {}
+        if include_cached:
+            masks = {(row["payment_type"], row["year"]): row["mask"] for row in conn.execute(
+                "SELECT payment_type, year, mask FROM local_paid_months WHERE member_id = ?", (member_id,))}
+        for key, mask in _pending_membership_masks(conn, member_id).items():
+            masks[key] = masks.get(key, 0) | mask
+        return masks
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------
+# 🔄 BULK FETCH
+# -----------------------------------------------------
+def _fetch_masks(conn, member_id=None):
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    month_names = ", ".join(["%s"] * 12)
+    if member_id is None:
+        query = PAID_MONTHS_QUERY.format(member_filter="", month_names=month_names)
+        params = MONTH_NAMES * 2
+    else:
+        query = PAID_MONTHS_QUERY.format(member_filter="AND member_id = %s", month_names=month_names)
+        params = [member_id, member_id] + MONTH_NAMES + MONTH_NAMES + [member_id]
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def sync_paid_months():
+    """Rebuild every local bitmap from one grouped query (part of the startup sync)."""
+    try:
+        conn = get_connection()
+        try:
+            rows = _fetch_masks(conn)
+        finally:
+            conn.close()
+        run_write(_replace_masks, rows)
+    except ConnectionError:
+        pass
+    except Exception as e:
+        print(f"Could not sync paid months: {e}")
+
+
+def get_member_paid_months(member_id):
+    """
+    Every paid-month bitmap of one member, all types and years: {(payment_type, year): mask}.
+    Online this is one query (also refreshing the cache); offline it comes from the cache.
+    Fetch it once when a payment dialog opens, then render any year from it.
+    """
+    if not member_id:
+        return {}
+
+    try:
+        conn = get_connection()
+        try:
+            rows = _fetch_masks(conn, member_id)
+        finally:
+            conn.close()
+    except ConnectionError:
+        return _local_masks(member_id)
+    except Exception as e:
+        print(f"Could not fetch paid months, using the local cache: {e}")
+        return _local_masks(member_id)
+
+    submit_write(_replace_masks, rows, member_id)
+    masks = {(r["payment_type"], int(r["year"])): int(r["mask"]) for r in rows if r["year"]}
+
+    # Offline payments not uploaded yet are not on the server
+    for key, mask in _local_masks(member_id, include_cached=False).items():
+        masks[key] = masks.get(key, 0) | mask
+    return masks
+
+
+def paid_month_names(masks, payment_type, year):
+    """Names of the months paid in `year`, from a get_member_paid_months() result."""
+    return mask_to_month_names(masks.get((payment_type, int(year)), 0))
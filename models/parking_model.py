@@ -1,8 +1,18 @@
 import uuid
 from datetime import date
-from database.db_connection import get_connection
+from database.db_connection import get_connection, PAGE_SIZE
 import app_state
 import pymysql.cursors
+from models.ledger_rollup_model import add_to_rollup
+from models.paid_months_model import mark_paid_months
+from utils.cache import SearchResultCache
+
+# Recent vehicle searches, keyed by the upper-cased search text. A longer search
+# ("LEB-12" after "LEB") is narrowed from the cached rows. Cleared on add_parking_payment.
+parking_search_cache = SearchResultCache(
+    lambda query, row: query in (row.get("vehicle_number") or "").upper(),
+    maxsize=64, ttl=60
+)
 
 
 def get_all_parking():
@@ -32,8 +42,45 @@ def get_all_parking():
     return rows
 
 
+def get_parking_page(after_parking_id=None, limit=PAGE_SIZE):
+    """
+    Fetch one page of parking records (newest first), keyset-paginated on parking_id.
+    Pass the last parking_id of the previous page to get the next one.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    query = """
+            SELECT p.parking_id, \
+                   p.transaction_id, \
+                   t.amount, \
+                   t.transaction_date,
+                   p.vehicle_number, \
+                   p.vehicle_type, \
+                   p.phone_number,
+                   p.payment_month, \
+                   p.payment_year,
+                   m.first_name, \
+                   m.last_name
+            FROM parking p
+                     JOIN transactions t ON p.transaction_id = t.transaction_id
+                     LEFT JOIN members m ON p.member_id = m.member_id
+            WHERE (%s IS NULL OR p.parking_id < %s)
+            ORDER BY p.parking_id DESC
+            LIMIT %s \
+            """
+    cursor.execute(query, (after_parking_id, after_parking_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
 def search_parking_by_vehicle(vehicle_number):
-    """Search parking records by vehicle number."""
+    """Search parking records by vehicle number (served from parking_search_cache when possible)."""
+    key = vehicle_number.upper()
+    cached = parking_search_cache.get(key)
+    if cached is not None:
+        return cached
+
     conn = get_connection()
     cursor = conn.cursor(pymysql.cursors.DictCursor)
     query = """
@@ -57,6 +104,7 @@ def search_parking_by_vehicle(vehicle_number):
     cursor.execute(query, (f"%{vehicle_number}%",))
     rows = cursor.fetchall()
     conn.close()
+    parking_search_cache.put(key, rows)
     return rows
 
 
@@ -76,26 +124,18 @@ def add_parking_payment(member_id, vehicle_number, phone, vehicle_type, total_am
         if not months:
             return False, "No months selected."
 
-        # Calculate amount per month
-        monthly_amount = total_amount / len(months)
+        # Calculate amount per month (to the paisa, as stored, like membership payments)
+        monthly_amount = round(total_amount / len(months), 2)
+
+        # One multi-row INSERT per table instead of two round trips per month
+        transaction_rows = []
+        parking_rows = []
 
         for m in months:
             transaction_id = str(uuid.uuid4())
 
-            # 1. Insert into Transactions
-            cursor.execute("""
-                           INSERT INTO transactions
-                           (transaction_id, member_id, user_id, transaction_type, amount, transaction_date)
-                           VALUES (%s, %s, %s, 'parking', %s, %s)
-                           """, (transaction_id, member_id, user_id, monthly_amount, date.today()))
-
-            # 2. Insert into Parking
-            cursor.execute("""
-                           INSERT INTO parking
-                           (transaction_id, member_id, vehicle_number, phone_number, vehicle_type, payment_month,
-                            payment_year)
-                           VALUES (%s, %s, %s, %s, %s, %s, %s)
-                           """, (transaction_id, member_id, vehicle_number, phone, vehicle_type, m, year))
+            transaction_rows.append((transaction_id, member_id, user_id, 'parking', monthly_amount, date.today()))
+            parking_rows.append((transaction_id, member_id, vehicle_number, phone, vehicle_type, m, year))
 
             results.append({
                 "transaction_id": transaction_id,
@@ -104,7 +144,26 @@ def add_parking_payment(member_id, vehicle_number, phone, vehicle_type, total_am
                 "amount": monthly_amount
             })
 
+        # 1. Insert into Transactions
+        cursor.executemany("""
+                           INSERT INTO transactions
+                           (transaction_id, member_id, user_id, transaction_type, amount, transaction_date)
+                           VALUES (%s, %s, %s, %s, %s, %s)
+                           """, transaction_rows)
+
+        add_to_rollup(cursor, [(row[5], row[3], row[4]) for row in transaction_rows])
+
+        # 2. Insert into Parking
+        cursor.executemany("""
+                           INSERT INTO parking
+                           (transaction_id, member_id, vehicle_number, phone_number, vehicle_type, payment_month,
+                            payment_year)
+                           VALUES (%s, %s, %s, %s, %s, %s, %s)
+                           """, parking_rows)
+
         conn.commit()
+        parking_search_cache.invalidate()
+        mark_paid_months(member_id, "parking", year, months)
         return True, results
 
     except Exception as e:
@@ -1,7 +1,9 @@
 import uuid
 from datetime import date, datetime
-from database.db_connection import get_connection
+from database.db_connection import get_connection, PAGE_SIZE
 import app_state
+from models.ledger_rollup_model import add_to_rollup
+from models.paid_months_model import mark_paid_months
 import pymysql.cursors
 
 
@@ -53,6 +55,35 @@ def get_all_tithes():
     return rows
 
 
+def get_tithes_page(after_tithe_id=None, limit=PAGE_SIZE):
+    """
+    Fetch one page of tithes (newest first), keyset-paginated on tithe_id.
+    Pass the last tithe_id of the previous page to get the next one.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    query = """
+            SELECT t.tithe_id, \
+                   t.transaction_id, \
+                   tr.amount, \
+                   t.tithe_month, \
+                   t.tithe_year,
+                   m.first_name, \
+                   m.last_name, \
+                   t.donor_name
+            FROM tithe t
+                     JOIN transactions tr ON t.transaction_id = tr.transaction_id
+                     LEFT JOIN members m ON t.member_id = m.member_id
+            WHERE (%s IS NULL OR t.tithe_id < %s)
+            ORDER BY t.tithe_id DESC
+            LIMIT %s \
+            """
+    cursor.execute(query, (after_tithe_id, after_tithe_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
 def add_tithe_payment(member_data, months, year, monthly_amount):
     """
     Record tithe payments.
@@ -70,24 +101,19 @@ def add_tithe_payment(member_data, months, year, monthly_amount):
 
         user_id = app_state.current_user['user_id'] if app_state.current_user else None
 
+        # Build all rows first, then send one multi-row INSERT per table.
+        # Every VALUES slot must be a placeholder for PyMySQL's executemany()
+        # to collapse the batch into a single statement.
+        transaction_rows = []
+        tithe_rows = []
+
         for m in months:
             transaction_id = str(uuid.uuid4())
             month_number = datetime.strptime(m, "%B").month
             tithe_date = f"{year}-{month_number:02d}-01"
 
-            # 1. Insert into Transactions (Ledger)
-            cursor.execute("""
-                           INSERT INTO transactions
-                           (transaction_id, member_id, user_id, transaction_type, amount, transaction_date)
-                           VALUES (%s, %s, %s, 'tithe', %s, %s)
-                           """, (transaction_id, member_id, user_id, monthly_amount, date.today()))
-
-            # 2. Insert into Tithe (Details)
-            cursor.execute("""
-                           INSERT INTO tithe
-                           (transaction_id, member_id, tithe_month, tithe_year, donor_name, donor_phone)
-                           VALUES (%s, %s, %s, %s, %s, %s)
-                           """, (transaction_id, member_id, tithe_date, year, donor_name, donor_phone))
+            transaction_rows.append((transaction_id, member_id, user_id, 'tithe', monthly_amount, date.today()))
+            tithe_rows.append((transaction_id, member_id, tithe_date, year, donor_name, donor_phone))
 
             results.append({
                 "transaction_id": transaction_id,
@@ -96,7 +122,24 @@ def add_tithe_payment(member_data, months, year, monthly_amount):
                 "amount": monthly_amount
             })
 
+        # 1. Insert into Transactions (Ledger)
+        cursor.executemany("""
+                           INSERT INTO transactions
+                           (transaction_id, member_id, user_id, transaction_type, amount, transaction_date)
+                           VALUES (%s, %s, %s, %s, %s, %s)
+                           """, transaction_rows)
+
+        add_to_rollup(cursor, [(row[5], row[3], row[4]) for row in transaction_rows])
+
+        # 2. Insert into Tithe (Details)
+        cursor.executemany("""
+                           INSERT INTO tithe
+                           (transaction_id, member_id, tithe_month, tithe_year, donor_name, donor_phone)
+                           VALUES (%s, %s, %s, %s, %s, %s)
+                           """, tithe_rows)
+
         conn.commit()
+        mark_paid_months(member_id, "tithe", year, months)
         return True, results
 
     except Exception as e:
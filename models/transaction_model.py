@@ -1,7 +1,9 @@
 import uuid
 from datetime import date
 import app_state
-from database.db_connection import get_connection
+from database.db_connection import get_connection, PAGE_SIZE
+from models.ledger_rollup_model import add_to_rollup, group_totals
+from utils.helpers import add_date_filter
 
 
 def create_transaction(member_id, transaction_type, amount):
@@ -22,6 +24,7 @@ def create_transaction(member_id, transaction_type, amount):
         INSERT INTO transactions (transaction_id, member_id, transaction_type, user_id, amount, transaction_date)
         VALUES (%s, %s, %s, %s, %s, %s)
     """, (transaction_id, member_id, transaction_type, user_id, amount, date.today()))
+    add_to_rollup(cursor, [(date.today(), transaction_type, amount)])
 
     conn.commit()
     cursor.close()
@@ -29,36 +32,23 @@ def create_transaction(member_id, transaction_type, amount):
 
     return transaction_id
 
-def get_all_transactions():
-    """Fetch all transactions with member and user info."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT 
-            t.transaction_id,
-            t.transaction_type,
-            t.amount,
-            t.transaction_date,
-            t.created_at,
-            m.first_name,
-            m.last_name,
-            u.username,
-            u.full_name
-        FROM transactions t
-        LEFT JOIN members m ON t.member_id = m.member_id
-        LEFT JOIN users u ON t.user_id = u.user_id
-        ORDER BY t.transaction_date DESC
-    """)
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return results
+def _transaction_filters(year, month, tr_type, exp_type):
+    """WHERE clauses and params shared by the ledger list and its totals (expects aliases t / e)."""
+    clauses = []
+    params = []
 
-def get_filtered_transactions(year, month, tr_type, exp_type):
-    conn = get_connection()
-    cursor = conn.cursor()
+    # Half-open range on the bare column (index-friendly) instead of YEAR()/MONTHNAME()
+    add_date_filter("t.transaction_date", year, month, clauses, params)
+    if tr_type != "All Types":
+        clauses.append("t.transaction_type = %s")
+        params.append(tr_type)
+    if tr_type == "expense" and exp_type != "All Expense Types":
+        clauses.append("e.expense_type = %s")
+        params.append(exp_type)
+    return clauses, params
 
-    query = """
+
+FILTERED_TRANSACTIONS_QUERY = """
     SELECT 
         t.transaction_id, t.transaction_date, t.transaction_type, t.amount,
         m.first_name AS member_name, u.full_name AS user_name,
@@ -74,22 +64,18 @@ def get_filtered_transactions(year, month, tr_type, exp_type):
     WHERE 1=1
     """
 
-    params = []
 
-    if year != "All":
-        query += " AND YEAR(t.transaction_date) = %s"
-        params.append(int(year))
-    if month != "All":
-        query += " AND MONTHNAME(t.transaction_date) = %s"
-        params.append(month)
-    if tr_type != "All Types":
-        query += " AND t.transaction_type = %s"
-        params.append(tr_type)
-    if tr_type == "expense" and exp_type != "All Expense Types":
-        query += " AND e.expense_type = %s"
-        params.append(exp_type)
+def get_filtered_transactions(year, month, tr_type, exp_type):
+    """Every transaction matching the filters (the Excel export); the grid pages through get_transactions_page()."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query = FILTERED_TRANSACTIONS_QUERY
+    clauses, params = _transaction_filters(year, month, tr_type, exp_type)
+    for clause in clauses:
+        query += f" AND {clause}"
 
-    query += " ORDER BY t.transaction_date DESC"
+    query += " ORDER BY t.transaction_date DESC, t.transaction_id DESC"
 
     cursor.execute(query, params)
     rows = cursor.fetchall()
@@ -97,8 +83,78 @@ def get_filtered_transactions(year, month, tr_type, exp_type):
     conn.close()
     return rows
 
-def get_transaction_summary(transactions):
-    income = sum(t['amount'] for t in transactions if t['amount'] > 0)
-    expense = sum(abs(t['amount']) for t in transactions if t['amount'] < 0)
-    net = income - expense
-    return {"income": income, "expense": expense, "net": net}
+def get_transactions_page(year, month, tr_type, exp_type, after=None, limit=PAGE_SIZE, id_contains=None):
+    """
+    Fetch one page of get_filtered_transactions(), keyset-paginated on
+    (transaction_date, transaction_id). `after` is the last row of the previous page.
+    `id_contains` narrows it to transaction IDs containing that text (the ID search).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query = FILTERED_TRANSACTIONS_QUERY
+    clauses, params = _transaction_filters(year, month, tr_type, exp_type)
+    if id_contains:
+        clauses.append("t.transaction_id LIKE %s")
+        params.append(f"%{id_contains}%")
+    if after:
+        clauses.append("(t.transaction_date < %s OR (t.transaction_date = %s AND t.transaction_id < %s))")
+        params += [after['transaction_date'], after['transaction_date'], after['transaction_id']]
+    for clause in clauses:
+        query += f" AND {clause}"
+
+    query += " ORDER BY t.transaction_date DESC, t.transaction_id DESC LIMIT %s"
+    params.append(limit)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+def get_transaction_totals(year, month, tr_type, exp_type):
+    """
+    Income / expense / net for the same filters as get_filtered_transactions(),
+    summed by the server. One grouped query (per type and month) returns a few
+    dozen rows however large the ledger is; the overall totals add those up.
+
+    Returns {"income", "expense", "net", "count",
+             "by_type":  [{"transaction_type", "income", "expense", "net", "count"}, ...],
+             "by_month": [{"month": "YYYY-MM", "income", "expense", "net", "count"}, ...]}
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    clauses, params = _transaction_filters(year, month, tr_type, exp_type)
+    # The details join is only needed to filter on the expense type
+    filters_expense_type = tr_type == "expense" and exp_type != "All Expense Types"
+    join = "JOIN expenses e ON t.transaction_id = e.transaction_id" if filters_expense_type else ""
+
+    query = f"""
+    SELECT
+        t.transaction_type,
+        DATE_FORMAT(t.transaction_date, '%%Y-%%m') AS month,
+        SUM(CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END) AS income,
+        SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END) AS expense,
+        COUNT(*) AS count
+    FROM transactions t
+    {join}
+    WHERE 1=1 {"".join(f" AND {clause}" for clause in clauses)}
+    GROUP BY t.transaction_type, month
+    """
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    income = sum(row["income"] or 0 for row in rows)
+    expense = sum(row["expense"] or 0 for row in rows)
+    return {
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "count": sum(row["count"] for row in rows),
+        "by_type": group_totals(rows, "transaction_type", "transaction_type"),
+        "by_month": group_totals(rows, "month", "month"),
+    }
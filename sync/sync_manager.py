@@ -1,19 +1,24 @@
 # sync_manager.py
-import os
-import sqlite3
-import time
 import threading
 import uuid
 from datetime import datetime
 import pymysql as mysql
-import requests
 
-from database.db_connection import get_connection
+from database.db_connection import get_connection, ConnectionError
+from database.local_store import get_local_connection, run_write
+from models.ledger_rollup_model import add_to_rollup
+from models.paid_months_model import mark_paid_months
+from utils.network_utils import is_database_reachable, add_reachability_listener
 import app_state
 
 # --- 🎯 GLOBAL STATUS VARIABLE ---
 _SYNC_STATUS = "🔄 Sync Status: Initializing..."
-LOCAL_DB_PATH = os.path.join(os.getcwd(), "local_cache.db")
+
+# Number of queued offline records uploaded per MySQL/SQLite transaction
+SYNC_CHUNK_SIZE = 50
+
+# One upload of the offline queue at a time (startup, auto-sync and the Sync button)
+_sync_lock = threading.Lock()
 
 
 # ----------------------------------------
@@ -33,68 +38,27 @@ def get_current_sync_status():
 
 
 # ----------------------------------------
-# 🧱 1. LOCAL DB INITIALIZATION
-# ----------------------------------------
-def init_local_db():
-    """Ensure the SQLite cache database and table exist."""
-    conn = sqlite3.connect(LOCAL_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS offline_membership
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       member_id
-                       INTEGER,
-                       year
-                       INTEGER,
-                       months
-                       TEXT,
-                       total_amount
-                       REAL,
-                       amount_per_month
-                       REAL,
-                       created_at
-                       TEXT,
-                       transaction_uuid
-                       TEXT
-                       UNIQUE
-                   )
-                   """)
-    conn.commit()
-    conn.close()
-
-
+# 🌐 1. INTERNET CHECK
 # ----------------------------------------
-# 🌐 2. INTERNET CHECK
-# ----------------------------------------
-def check_internet_connection():
-    """Quickly check if internet is available."""
-    try:
-        requests.get("https://www.google.com", timeout=5)
-        return True
-    except Exception:
-        return False
+def check_internet_connection(force=False):
+    """
+    Quickly check if the database server is reachable.
+    Reads the connection circuit breaker's state instead of an HTTP probe;
+    `force` tries a real connection now instead of trusting that state.
+    """
+    return is_database_reachable(force=force)
 
 
 # ----------------------------------------
-# 💾 3. SAVE OFFLINE RECORD
+# 💾 2. SAVE OFFLINE RECORD
 # ----------------------------------------
 def save_offline_membership(member_id, months, year, total_amount, amount_per_month):
     """Save membership payments locally in SQLite if MySQL is unreachable."""
-    init_local_db()
-
-    conn = sqlite3.connect(LOCAL_DB_PATH)
-    cursor = conn.cursor()
-
     # Use the same transaction ID logic as the online payment function for consistency
     generated_uuid = str(uuid.uuid4())
 
     try:
-        cursor.execute("""
+        run_write(lambda conn: conn.execute("""
                        INSERT INTO offline_membership (member_id, year, months, total_amount, amount_per_month,
                                                        created_at, transaction_uuid)
                        VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -106,33 +70,172 @@ def save_offline_membership(member_id, months, year, total_amount, amount_per_mo
                            amount_per_month,
                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                            generated_uuid
-                       ))
-        conn.commit()
+                       )))
         set_current_sync_status(f"⚠️ Offline: Saved {len(months)} months locally. Awaiting sync.")
         return generated_uuid
     except Exception as e:
         print(f"❌ Error saving offline record: {e}")
         return None
-    finally:
-        conn.close()
 
 
 # ----------------------------------------
-# 🔁 4. UPLOAD LOGIC (used by both manual + auto sync)
+# 🔁 3. UPLOAD LOGIC (used by both manual + auto sync)
 # ----------------------------------------
-def sync_local_memberships():
-    """Uploads all locally saved membership records to MySQL if internet is available."""
-    if not check_internet_connection():
+def offline_transaction_id(transaction_uuid, year, month_number):
+    """
+    Deterministic per-month transaction_id for a queued offline record.
+
+    Derived from the record's stored transaction_uuid, so re-uploading the same
+    record (after a crash between the MySQL commit and the SQLite delete) always
+    produces the same ids and the server can skip what it already has.
+    """
+    try:
+        namespace = uuid.UUID(str(transaction_uuid))
+    except ValueError:
+        namespace = uuid.uuid5(uuid.NAMESPACE_URL, str(transaction_uuid))
+    return str(uuid.uuid5(namespace, f"{year}-{int(month_number):02d}"))
+
+
+def _build_upload_rows(records, user_id):
+    """Expand queued offline records into per-month transactions/membership rows."""
+    transaction_rows = []
+    membership_rows = []
+    synced_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    for record in records:
+        (
+            local_id,
+            member_id,
+            year,
+            months_csv,
+            total_amount,
+            amount_per_month,
+            created_at,
+            transaction_uuid
+        ) = record
+
+        months = months_csv.split(",")
+
+        # NOTE: The division logic is safer to use the stored amount_per_month
+        # rather than recalculating, but we'll use your original calculation
+        per_month = round(float(total_amount) / len(months), 2)
+
+        if not transaction_uuid:
+            # Queue rows written before transaction_uuid existed: key them on the local row instead
+            transaction_uuid = f"offline-membership-{local_id}-{created_at}"
+
+        for m in months:
+            month_number = datetime.strptime(m, "%B").month
+            transaction_id = offline_transaction_id(transaction_uuid, year, month_number)
+            payment_date = f"{year}-{month_number:02d}-01"
+
+            transaction_rows.append((transaction_id, member_id, user_id, "membership", per_month, synced_at))
+            membership_rows.append((transaction_id, member_id, payment_date, year))
+
+    return transaction_rows, membership_rows
+
+
+def _check_written(table, written, rows):
+    """Every row of an upload insert must land; otherwise the chunk is rolled back."""
+    if written != len(rows):
+        raise RuntimeError(f"Only {written} of {len(rows)} {table} row(s) were written")
+
+
+def _upload_chunk(mysql_conn, records, user_id):
+    """
+    Upload a chunk of offline records in ONE MySQL transaction, then remove them
+    from the local queue in ONE SQLite transaction.
+    Idempotent: rows already on the server (same deterministic transaction_id)
+    are skipped, so an interrupted sync can simply be re-run. The rest go in with
+    plain INSERTs, so a real error (a member deleted on the server, or a duplicate
+    key from a concurrent upload, see migration 0007) rolls the chunk back and is
+    reported instead of being dropped silently.
+    """
+    transaction_rows, membership_rows = _build_upload_rows(records, user_id)
+
+    mysql_cursor = mysql_conn.cursor()
+    try:
+        # 0. One lookup for ids a previous (interrupted) upload already wrote
+        ids = [row[0] for row in transaction_rows]
+        placeholders = ",".join(["%s"] * len(ids))
+        mysql_cursor.execute(f"""
+                             SELECT transaction_id, 'transactions' AS source FROM transactions
+                             WHERE transaction_id IN ({placeholders})
+                             UNION ALL
+                             SELECT transaction_id, 'membership' AS source FROM membership
+                             WHERE transaction_id IN ({placeholders})
+                             """, ids + ids)
+        existing = {(row['transaction_id'], row['source']) for row in mysql_cursor.fetchall()}
+
+        # 1. Insert into transactions (single multi-row INSERT of the rows not already there)
+        new_transaction_rows = [row for row in transaction_rows if (row[0], 'transactions') not in existing]
+        if new_transaction_rows:
+            written = mysql_cursor.executemany("""
+                                               INSERT INTO transactions (transaction_id, member_id, user_id,
+                                                                         transaction_type, amount, transaction_date)
+                                               VALUES (%s, %s, %s, %s, %s, %s)
+                                               """, new_transaction_rows)
+            _check_written("transactions", written, new_transaction_rows)
+            add_to_rollup(mysql_cursor, [(row[5], row[3], row[4]) for row in new_transaction_rows])
+
+        # 2. Insert into membership (single multi-row INSERT of the months not already there)
+        new_membership_rows = [row for row in membership_rows if (row[0], 'membership') not in existing]
+        if new_membership_rows:
+            written = mysql_cursor.executemany("""
+                                               INSERT INTO membership (transaction_id, member_id, payment_month,
+                                                                       payment_year)
+                                               VALUES (%s, %s, %s, %s)
+                                               """, new_membership_rows)
+            _check_written("membership", written, new_membership_rows)
+
+        mysql_conn.commit()
+    except Exception:
+        mysql_conn.rollback()
+        raise
+    finally:
+        mysql_cursor.close()
+
+    # Once the queue row is gone only the cached bitmaps remember these months
+    for record in records:
+        mark_paid_months(record[1], "membership", record[2], (record[3] or "").split(","))
+
+    local_ids = [record[0] for record in records]
+    placeholders = ",".join("?" * len(local_ids))
+    run_write(lambda local_conn: local_conn.execute(f"DELETE FROM offline_membership WHERE id IN ({placeholders})",
+                                                    local_ids))
+
+
+def sync_local_memberships(chunk_size=SYNC_CHUNK_SIZE, force_check=False):
+    """
+    Uploads all locally saved membership records to MySQL if internet is available.
+    Records are sent in chunks of `chunk_size`, one transaction per chunk; a chunk
+    that fails is retried record-by-record so one bad record cannot block the rest.
+    Only one upload runs at a time; a second caller returns straight away.
+    `force_check` re-probes the server instead of using the cached reachability.
+    """
+    if not _sync_lock.acquire(blocking=False):
+        return False, "Sync already running."
+    try:
+        return _sync_local_memberships(chunk_size, force_check)
+    finally:
+        _sync_lock.release()
+
+
+def _sync_local_memberships(chunk_size, force_check):
+    if not check_internet_connection(force=force_check):
         # Report status immediately and exit
         set_current_sync_status("⚠️ Sync Status: Offline — sync postponed.")
         return False, "Offline — sync postponed."
 
     set_current_sync_status("🔄 Sync Status: Connecting to server...")
 
-    init_local_db()
-    conn = sqlite3.connect(LOCAL_DB_PATH)
+    conn = get_local_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM offline_membership")
+    cursor.execute("""
+                   SELECT id, member_id, year, months, total_amount, amount_per_month, created_at, transaction_uuid
+                   FROM offline_membership
+                   ORDER BY id
+                   """)
     records = cursor.fetchall()
 
     if not records:
@@ -143,122 +246,92 @@ def sync_local_memberships():
     set_current_sync_status(f"🔄 Sync Status: Uploading {len(records)} pending record(s)...")
 
     mysql_conn = None
-    mysql_cursor = None
     synced = 0
     failed = 0
+    chunk_size = max(1, int(chunk_size))
+    user_id = app_state.current_user['user_id'] if app_state.current_user else None
 
     try:
         mysql_conn = get_connection()
-        mysql_cursor = mysql_conn.cursor()
-
-        for record in records:
-            (
-                local_id,
-                member_id,
-                year,
-                months_csv,
-                total_amount,
-                amount_per_month,
-                created_at,
-                transaction_uuid  # Not used in SQL but kept for reference
-            ) = record
 
-            try:
-                months = months_csv.split(",")
-
-                # NOTE: The division logic is safer to use the stored amount_per_month
-                # rather than recalculating, but we'll use your original calculation
-                per_month = round(float(total_amount) / len(months), 2)
-
-                for m in months:
-                    transaction_id = str(uuid.uuid4())
-                    month_number = datetime.strptime(m, "%B").month
-                    payment_date = f"{year}-{month_number:02d}-01"
-
-                    # 1. Insert into transactions
-                    mysql_cursor.execute("""
-                                         INSERT INTO transactions (transaction_id, member_id, user_id, transaction_type,
-                                                                   amount, transaction_date)
-                                         VALUES (%s, %s, %s, %s, %s, %s)
-                                         """, (
-                                             transaction_id,
-                                             member_id,
-                                             app_state.current_user['user_id'],
-                                             "membership",
-                                             per_month,
-                                             datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                         ))
-
-                    # 2. Insert into membership
-                    mysql_cursor.execute("""
-                                         INSERT INTO membership (transaction_id, member_id, payment_month, payment_year)
-                                         VALUES (%s, %s, %s, %s)
-                                         """, (
-                                             transaction_id,
-                                             member_id,
-                                             payment_date,
-                                             year
-                                         ))
-
-                mysql_conn.commit()
-
-                cursor.execute("DELETE FROM offline_membership WHERE id = ?", (local_id,))
-                conn.commit()
-                synced += 1
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
 
+            try:
+                _upload_chunk(mysql_conn, chunk, user_id)
+                synced += len(chunk)
+                continue
             except Exception as e:
-                mysql_conn.rollback()  # Rollback the failed record's transaction
-                print(f"❌ Sync failed for local record {local_id}: {e}")
-                failed += 1
+                print(f"⚠️ Bulk upload failed for {len(chunk)} record(s), retrying individually: {e}")
+
+            for record in chunk:
+                try:
+                    _upload_chunk(mysql_conn, [record], user_id)
+                    synced += 1
+                except Exception as e:
+                    print(f"❌ Sync failed for local record {record[0]}: {e}")
+                    failed += 1
 
         final_message = f"🔄 Sync complete: {synced} uploaded, {failed} failed."
         set_current_sync_status(final_message)
         return True, final_message
 
-    except mysql.connector.Error as db_err:
+    except (ConnectionError, mysql.err.MySQLError) as db_err:
         error_msg = f"❌ Sync Status: DB Connection Error ({db_err})"
         set_current_sync_status(error_msg)
         return False, error_msg
 
     finally:
-        if mysql_cursor: mysql_cursor.close()
-        if mysql_conn and mysql_conn.is_connected(): mysql_conn.close()
+        if mysql_conn: mysql_conn.close()
         conn.close()
 
 
+def is_sync_running():
+    """True while an upload of the offline queue is in progress."""
+    return _sync_lock.locked()
+
+
 # ----------------------------------------
-# 🔘 5. MANUAL SYNC (button)
+# 🔘 4. MANUAL SYNC (button)
 # ----------------------------------------
 def sync_offline_data():
     """
     Manual sync trigger for GUI 'Sync Now' button.
+    Always probes the server afresh, so a server that just came back is used at once.
     """
     set_current_sync_status("🔄 Sync Status: Manually triggered sync...")
-    return sync_local_memberships()
+    return sync_local_memberships(force_check=True)
 
 
 # ----------------------------------------
-# ⚙️ 6. AUTO-SYNC THREAD
+# ⚙️ 5. AUTO-SYNC THREAD
 # ----------------------------------------
 def start_auto_sync(interval=60):
     """
     Automatically runs sync every `interval` seconds in the background.
+    Also wakes up immediately when the database becomes reachable again.
     """
+    wake_event = threading.Event()
+
+    def _on_reachability_change(reachable):
+        if reachable:
+            wake_event.set()
+        else:
+            set_current_sync_status("⚠️ Sync Status: Database unreachable — working offline.")
+
+    add_reachability_listener(_on_reachability_change)
 
     def _auto_sync_loop():
         # Initial status setup
         set_current_sync_status("🟢 Auto-sync thread active. Monitoring...")
 
         while True:
-            # Check internet before attempting connection
-            if check_internet_connection():
-                success, msg = sync_local_memberships()
-                # sync_local_memberships updates the status, so just log here.
-            else:
-                set_current_sync_status("⚠️ Sync Status: Offline — checking again in 5 minutes.")
+            # sync_local_memberships checks reachability (the breaker's state) itself
+            sync_local_memberships()
 
-            time.sleep(interval)
+            wake_event.wait(interval)
+            wake_event.clear()
 
     thread = threading.Thread(target=_auto_sync_loop, daemon=True)
     thread.start()
-    print("🟢 Auto-sync thread started.")
\ No newline at end of file
+    print("🟢 Auto-sync thread started.")
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache with an optional time-to-live (seconds).
+    Holds at most `maxsize` entries; the least recently used one is evicted first.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def items(self):
+        """Live (key, value) pairs, most recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in reversed(self._data.items())
+                    if expires_at is None or now < expires_at]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SearchResultCache:
+    """
+    Query -> result-list cache for search boxes.
+
+    Besides exact repeats, a query that refines a cached one (e.g. "LEB-1" after
+    "LEB") is answered by filtering the cached rows with `matcher(query, row)`
+    instead of asking the database again.
+
+    refines(old, new): True when every row matching `new` also matches `old`
+                       (default: `old` is a substring of `new`, i.e. LIKE '%q%').
+    trust_empty:       whether an empty narrowed result counts as a hit. Set it to
+                       False when a fresh search can find more (e.g. typo correction).
+
+    Rows stored with complete=False (a truncated or differently-matched result)
+    are only reused for exact repeats.
+    """
+
+    def __init__(self, matcher, refines=None, maxsize=64, ttl=300, trust_empty=True):
+        self.matcher = matcher
+        self.refines = refines or (lambda old, new: old in new)
+        self.trust_empty = trust_empty
+        self._entries = LRUCache(maxsize, ttl)
+
+    def get(self, query):
+        """Return the cached rows for `query` (as a new list), or None on a miss."""
+        hit = self._entries.get(query)
+        if hit is not None:
+            return list(hit[0])
+
+        for old_query, (rows, complete) in self._entries.items():
+            if not complete or not old_query or not self.refines(old_query, query):
+                continue
+            narrowed = [row for row in rows if self.matcher(query, row)]
+            if not narrowed and not self.trust_empty:
+                return None
+            self._entries.put(query, (narrowed, True))
+            return list(narrowed)
+        return None
+
+    def put(self, query, rows, complete=True):
+        self._entries.put(query, (list(rows or []), complete))
+
+    def invalidate(self):
+        """Drop everything (call after a write that could change any result)."""
+        self._entries.clear()
@@ -0,0 +1,41 @@
+from datetime import date
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+
+def date_range(year, month="All"):
+    """
+    Half-open [start, end) date range for a report filter selection.
+
+    year:  int/str year, or "All"
+    month: month name ("January"...), or "All"
+
+    Returns (start, end) or None when the year is "All". Filtering with
+    `col >= start AND col < end` keeps the column bare, so an index on it is used.
+    """
+    if year == "All":
+        return None
+
+    year = int(year)
+    if month == "All":
+        return date(year, 1, 1), date(year + 1, 1, 1)
+
+    month_number = MONTH_NAMES.index(month) + 1
+    start = date(year, month_number, 1)
+    end = date(year + 1, 1, 1) if month_number == 12 else date(year, month_number + 1, 1)
+    return start, end
+
+
+def add_date_filter(column, year, month, clauses, params):
+    """
+    Append a sargable year/month filter on `column` to a WHERE-clause builder.
+    A month without a year cannot be expressed as one range, so it falls back to MONTH().
+    """
+    bounds = date_range(year, month)
+    if bounds:
+        clauses.append(f"{column} >= %s AND {column} < %s")
+        params.extend(bounds)
+    elif month != "All":
+        clauses.append(f"MONTH({column}) = %s")
+        params.append(MONTH_NAMES.index(month) + 1)
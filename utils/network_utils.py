@@ -1,9 +1,31 @@
-import socket
+from database.db_connection import (
+    is_database_offline, check_database_connection, add_connection_listener, remove_connection_listener
+)
+
+# Reachability of the database server, as recorded by the connection circuit breaker
+# in database/db_connection.py. Every get_connection() updates it, so sync and the
+# models always agree on whether the server is up; nothing here probes on its own.
+
+
+def is_database_reachable(force=False):
+    """
+    Whether the database server is reachable: the breaker's current state, or with
+    `force` one real connection attempt made now (and recorded on the breaker).
+    """
+    if force:
+        return check_database_connection()
+    return not is_database_offline()
+
+
+def add_reachability_listener(callback):
+    """Register callback(is_reachable) to be notified when the DB goes on/offline."""
+    add_connection_listener(callback)
+
+
+def remove_reachability_listener(callback):
+    remove_connection_listener(callback)
+
 
 def is_internet_available():
-    """Check if internet connection exists (Google DNS ping)."""
-    try:
-        socket.create_connection(("8.8.8.8", 53), timeout=3)
-        return True
-    except OSError:
-        return False
+    """Check if the database server is reachable (kept for older callers)."""
+    return is_database_reachable()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+APP_DIR_NAME = "ChurchManagementSystem"
+
+
+def user_data_dir():
+    """
+    Per-user directory for the app's own files (local cache, offline queue).
+    Independent of the launch directory and of PyInstaller's temporary _MEIPASS.
+
+    - CHURCHAPP_DATA_DIR, if set (portable installs, tests)
+    - Windows: %LOCALAPPDATA%\\ChurchManagementSystem
+    - macOS:   ~/Library/Application Support/ChurchManagementSystem
+    - Linux:   $XDG_DATA_HOME/ChurchManagementSystem (default ~/.local/share)
+
+    Falls back to the current directory if the folder cannot be created.
+    """
+    path = os.environ.get("CHURCHAPP_DATA_DIR")
+    if not path:
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        elif sys.platform == "darwin":
+            base = os.path.join(os.path.expanduser("~"), "Library", "Application Support")
+        else:
+            base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        path = os.path.join(base, APP_DIR_NAME)
+
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        print(f"Warning: cannot create data directory {path} ({e}); using the current directory.")
+        path = os.path.abspath(".")
+    return path